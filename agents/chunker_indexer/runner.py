@@ -85,11 +85,11 @@ def run(ingest: IngestionResult, max_chars: int = 64_000) -> dict:
     if buf:
         _flush()
 
-    # 2 ▸ Return model
+    # 2 ▸ Return model (+ its cached column-wise arrays for batch consumers)
     res = ChunkerResult(
         chunks=chunks,
         num_chunks=len(chunks),
         total_tokens=sum(c.token_count for c in chunks),
         embedding_model=None,       # fill once you add embeddings
     )
-    return {"chunk_res": res, "chunks": res.chunks}
+    return {"chunk_res": res, "chunks": res.chunks, "chunk_arrays": res.arrays}
@@ -4,8 +4,9 @@ Simple ingestion — identical to the original extractor_core implementation.
 * No OCR fallback
 """
 
-from pathlib import Path
+import io
 import logging
+from docling.datamodel.base_models import DocumentStream
 from docling.document_converter import DocumentConverter
 from libs.schema.ingestion import IngestionResult
 
@@ -13,12 +14,13 @@ logger = logging.getLogger(__name__)
 
 
 def run(pdf_bytes: bytes) -> dict:
-    tmp = Path("/tmp/ingest.pdf")
-    tmp.write_bytes(pdf_bytes)
+    # Docling reads the bytes from memory, so no temp file is written; each
+    # call gets its own stream, which keeps concurrent ingestions apart
+    source = DocumentStream(name="ingest.pdf", stream=io.BytesIO(pdf_bytes))
 
     try:
         converter = DocumentConverter()
-        result = converter.convert(str(tmp))
+        result = converter.convert(source)
         text = result.document.export_to_markdown()
         confidence = 0.95 if len(text.strip()) > 200 else 0.0
     except Exception as e:
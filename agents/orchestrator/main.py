@@ -2,6 +2,8 @@ from pathlib import Path
 import csv
 import io
 import json
+import os
+import tempfile
 from agents.ingestion_ocr.extractor_core import (
     extract_clinical_info,
     process_pdf_to_xml,
@@ -11,6 +13,9 @@ from agents.ingestion_ocr.runner import run as run_ingest
 from agents.chunker_indexer.runner import run as run_chunker
 from agents.outcome_extractor.runner import run as run_outcomes
 
+# Stage PDFs on RAM-backed tmpfs when the host has one
+_TMP_ROOT = "/dev/shm" if os.path.isdir("/dev/shm") else None
+
 
 # # ── NEW: return the structured dict ───────────────────────────────────────────
 # def extract_info(pdf_bytes: bytes) -> dict:
@@ -51,17 +56,20 @@ def extract_info(pdf_bytes: bytes) -> dict:
 
     return info_dict
 
+def _staged_pdf_to_xml(pdf_bytes: bytes, name: str) -> str:
+    """Write the PDF to a private temp dir (removed afterwards) and convert it."""
+    with tempfile.TemporaryDirectory(dir=_TMP_ROOT) as tmp_dir:
+        tmp = Path(tmp_dir) / name
+        tmp.write_bytes(pdf_bytes)
+        return process_pdf_to_xml(str(tmp))
+
 # existing helper that returns XML
 def run_pipeline(pdf_bytes: bytes) -> str:
-    tmp = Path("/tmp/in_pdf.pdf")
-    tmp.write_bytes(pdf_bytes)
-    return process_pdf_to_xml(str(tmp))
+    return _staged_pdf_to_xml(pdf_bytes, "in_pdf.pdf")
 
 def pdf_bytes_to_xml(pdf_bytes: bytes) -> str:
     """Convenience wrapper around ``process_pdf_to_xml`` for byte streams."""
-    tmp = Path("/tmp/in_pdf_for_xml.pdf")
-    tmp.write_bytes(pdf_bytes)
-    return process_pdf_to_xml(str(tmp))
+    return _staged_pdf_to_xml(pdf_bytes, "in_pdf_for_xml.pdf")
 
 
 def info_to_csv(info: dict) -> str:
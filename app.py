@@ -3,15 +3,25 @@ Enhanced Streamlit UI for Clinical Trial Extraction with Comparison
 """
 import streamlit as st
 import json
+import hashlib
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 from datetime import datetime
 from pathlib import Path
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import time
 import uuid
-from pipeline_adapter import PipelineAdapter, ExtractionJob
+from pipeline_adapter import PipelineAdapter, ExtractionJob, JobSummary
 from incremental_extractor.field_equivalence_checker import FieldEquivalenceChecker
 
+# orjson is optional; it serializes in C and returns bytes ready for download
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Page config
 st.set_page_config(
     page_title="Clinical Protocol Extractor",
@@ -19,7 +29,7 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state
+# Initialize session state; jobs maps job_id -> JobSummary, full jobs stay on disk
 if 'jobs' not in st.session_state:
     st.session_state.jobs = {}
 if 'current_job_id' not in st.session_state:
@@ -30,18 +40,32 @@ if 'current_job_id' not in st.session_state:
 def get_pipeline_adapter():
     return PipelineAdapter()
 
+@st.cache_data(max_entries=512, show_spinner=False)
+def classify_file(filename: str) -> Tuple[Optional[str], str]:
+    """NCT number and document type parsed from an uploaded file's name"""
+    adapter = get_pipeline_adapter()
+    return adapter.extract_nct_number(filename), adapter.determine_doc_type(filename)
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def display_table(rows: Tuple[Tuple[Any, ...], ...], columns: Tuple[str, ...]) -> pa.Table:
+    """Arrow form of a read-only table; Arrow tables are immutable, so one copy serves every rerun"""
+    return pa.Table.from_pandas(pd.DataFrame(list(rows), columns=list(columns)), preserve_index=False)
+
+@st.cache_resource(max_entries=32)
+def load_job(job_id: str) -> Optional[ExtractionJob]:
+    """Full job (results included) from the adapter's job store"""
+    return get_pipeline_adapter().load_job(job_id)
+
+# Minimum seconds between progress redraws; updates in between are coalesced
+PROGRESS_MIN_INTERVAL = 0.1
+
 def create_progress_placeholder():
     """Create a placeholder for progress updates"""
-    progress_container = st.container()
-    with progress_container:
-        progress_bar = st.progress(0)
-        status_text = st.empty()
-    return progress_bar, status_text
+    return st.progress(0)
 
-def update_progress(progress_bar, status_text, progress: float, message: str):
-    """Update progress indicators"""
-    progress_bar.progress(int(progress))
-    status_text.text(message)
+def update_progress(progress_bar, progress: float, message: str):
+    """Update the progress bar and its message in one frontend message"""
+    progress_bar.progress(int(progress), text=message)
 
 def render_comparison_metrics(stats: Dict[str, Any]):
     """Render comparison metrics"""
@@ -75,129 +99,158 @@ def render_comparison_metrics(stats: Dict[str, Any]):
             help="Fields found in PDFs but not in CT.gov"
         )
 
-def render_field_comparison(unified_data: Dict[str, Any], ctgov_data: Dict[str, Any]):
+# Extracted field name -> CT.gov CSV column; unmapped fields use their own name
+FIELD_MAPPING = {
+    'nct_number': 'NCT Number',
+    'study_title': 'Study Title',
+    'acronym': 'Acronym',
+    'brief_summary': 'Brief Summary',
+    'conditions': 'Conditions',
+    'interventions': 'Interventions',
+    'sponsor': 'Sponsor',
+    'primary_outcome_measures': 'Primary Outcome Measures',
+    'secondary_outcome_measures': 'Secondary Outcome Measures',
+    # Add more mappings as needed
+}
+
+# Status -> indicator shown in front of it in the comparison table
+STATUS_COLORS = {
+    'Not Found': '🔴',
+    'Unique': '🟡',
+    'Match': '🟢',
+    'Partial Match': '🟡',
+    'Mismatch': '🟠',
+}
+
+# Indicator plus status name, without confidence; what the status filter selects on
+STATUS_GROUPS = pd.CategoricalDtype([f"{color} {status}" for status, color in STATUS_COLORS.items()])
+
+def _truncate_column(values: pd.Series, limit: int = 100) -> pd.Series:
+    """Cut strings to `limit` characters, marking the cut ones with '...'"""
+    return values.str.slice(0, limit) + np.where(values.str.len() > limit, '...', '')
+
+@st.cache_data(show_spinner=False)
+def build_field_comparison(unified_data: Dict[str, Any], ctgov_data: Dict[str, Any],
+                           api_key: Optional[str]) -> pd.DataFrame:
+    """
+    Build the field comparison table.
+    
+    Cached on the job's data so filter changes and other reruns neither redo
+    the string work nor repeat the ChatGPT equivalence checks.
+    """
+    fields = unified_data['fields']
+    names = list(fields)
+    extracted = pd.Series([f.get('value', '') for f in fields.values()], index=names, dtype=object)
+    ctgov = pd.Series(
+        [ctgov_data.get(FIELD_MAPPING.get(name, name), '') if ctgov_data else '' for name in names],
+        index=names, dtype=object
+    )
+    extracted_str = extracted.astype(str)
+    ctgov_str = ctgov.astype(str)
+    
+    # Status from plain text comparison; ChatGPT refines rows where both values exist
+    has_extracted = extracted.astype(bool)
+    has_ctgov = ctgov.astype(bool)
+    text_match = extracted_str.str.lower().str.strip() == ctgov_str.str.lower().str.strip()
+    status = pd.Series(
+        np.select(
+            [~has_extracted, ~has_ctgov, text_match],
+            ['Not Found', 'Unique', 'Match'],
+            default='Mismatch'
+        ),
+        index=names, dtype=object
+    )
+    confidence = pd.Series(None, index=names, dtype=object)
+    explanation = pd.Series('', index=names, dtype=object)
+    
+    equivalence_checker = FieldEquivalenceChecker(api_key) if api_key else None
+    if equivalence_checker:
+        for name in status.index[has_extracted & has_ctgov]:
+            equivalence_result = equivalence_checker.check_equivalence(
+                name, extracted[name], ctgov[name]
+            )
+            
+            if equivalence_result:
+                # Use ChatGPT result
+                status[name] = {
+                    'MATCH': 'Match',
+                    'PARTIAL_MATCH': 'Partial Match',
+                }.get(equivalence_result.match_status, 'Mismatch')
+                confidence[name] = equivalence_result.confidence
+                explanation[name] = equivalence_result.explanation
+            elif status[name] == 'Match':
+                # Fallback to simple comparison
+                confidence[name] = 100
+                explanation[name] = "Exact text match"
+    
+    # Build status string with confidence if available
+    status_group = status.map(STATUS_COLORS) + ' ' + status
+    status_str = status_group + np.where(confidence.notna(), ' (' + confidence.astype(str) + '%)', '')
+    
+    return pd.DataFrame({
+        'Field': names,
+        'Status': status_str.to_numpy(),
+        'Extracted': _truncate_column(extracted_str).to_numpy(),
+        'CT.gov': _truncate_column(ctgov_str).to_numpy(),
+        'Source': [f.get('source_document', 'N/A') for f in fields.values()],
+        'Explanation': explanation.to_numpy(),
+        'Status Group': pd.Categorical(status_group, dtype=STATUS_GROUPS)
+    })
+
+@st.cache_data(show_spinner=False)
+def comparison_stats(job_id: str, _unified_data: Dict[str, Any], _ctgov_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Overview statistics for a job, compared once rather than on every rerun"""
+    return get_pipeline_adapter().get_comparison_stats(_unified_data, _ctgov_data)
+
+@st.cache_data(show_spinner=False)
+def comparison_csv(job_id: str, statuses: Tuple[str, ...], _df: pd.DataFrame) -> str:
+    """CSV download payload for a job's comparison table filtered to `statuses`"""
+    return _df.to_csv(index=False)
+
+@st.cache_data(show_spinner=False)
+def job_json(job_id: str, part: str, _data: Any) -> bytes:
+    """JSON download payload for part of a job's results, which never change once complete"""
+    if orjson is not None:
+        return orjson.dumps(_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(_data, indent=2).encode()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def read_report(report_path: str, mtime: float) -> bytes:
+    """Report file contents for download; the modification time keys out stale copies"""
+    return Path(report_path).read_bytes()
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def report_preview(report_path: str, mtime: float, limit: int = 2000) -> str:
+    """First `limit` characters of a report, read without loading the rest of the file"""
+    with open(report_path, 'r') as f:
+        head = f.read(limit + 1)
+    return head[:limit] + "..." if len(head) > limit else head
+
+def render_field_comparison(job_id: str, unified_data: Dict[str, Any], ctgov_data: Dict[str, Any]):
     """Render detailed field comparison"""
     if 'fields' not in unified_data:
         st.warning("No field data available for comparison")
         return
     
-    # Initialize field equivalence checker
     api_key = os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY")
-    equivalence_checker = FieldEquivalenceChecker(api_key) if api_key else None
-    
-    # Prepare comparison data
-    comparison_data = []
-    
-    field_mapping = {
-        'nct_number': 'NCT Number',
-        'study_title': 'Study Title',
-        'acronym': 'Acronym',
-        'brief_summary': 'Brief Summary',
-        'conditions': 'Conditions',
-        'interventions': 'Interventions',
-        'sponsor': 'Sponsor',
-        'primary_outcome_measures': 'Primary Outcome Measures',
-        'secondary_outcome_measures': 'Secondary Outcome Measures',
-        # Add more mappings as needed
-    }
-    
-    for field_name, field_data in unified_data['fields'].items():
-        extracted_value = field_data.get('value', '')
-        source_doc = field_data.get('source_document', 'N/A')
-        
-        # Get CT.gov value
-        ctgov_field = field_mapping.get(field_name, field_name)
-        ctgov_value = ctgov_data.get(ctgov_field, '') if ctgov_data else ''
-        
-        # Determine match status
-        confidence = None
-        explanation = ""
-        
-        if not extracted_value:
-            status = 'Not Found'
-            status_color = '🔴'
-        elif not ctgov_value:
-            status = 'Unique'
-            status_color = '🟡'
-        else:
-            # Both values exist - use ChatGPT comparison if available
-            if equivalence_checker:
-                equivalence_result = equivalence_checker.check_equivalence(
-                    field_name, extracted_value, ctgov_value
-                )
-                
-                if equivalence_result:
-                    # Use ChatGPT result
-                    if equivalence_result.match_status == "MATCH":
-                        status = 'Match'
-                        status_color = '🟢'
-                    elif equivalence_result.match_status == "PARTIAL_MATCH":
-                        status = 'Partial Match'
-                        status_color = '🟡'
-                    else:
-                        status = 'Mismatch'
-                        status_color = '🟠'
-                    
-                    confidence = equivalence_result.confidence
-                    explanation = equivalence_result.explanation
-                else:
-                    # Fallback to simple comparison
-                    if str(extracted_value).lower().strip() == str(ctgov_value).lower().strip():
-                        status = 'Match'
-                        status_color = '🟢'
-                        confidence = 100
-                        explanation = "Exact text match"
-                    else:
-                        status = 'Mismatch'
-                        status_color = '🟠'
-            else:
-                # No API key - use simple comparison
-                if str(extracted_value).lower().strip() == str(ctgov_value).lower().strip():
-                    status = 'Match'
-                    status_color = '🟢'
-                else:
-                    status = 'Mismatch'
-                    status_color = '🟠'
-        
-        # Build status string with confidence if available
-        status_str = f"{status_color} {status}"
-        if confidence is not None:
-            status_str += f" ({confidence}%)"
-        
-        comparison_data.append({
-            'Field': field_name,
-            'Status': status_str,
-            'Extracted': str(extracted_value)[:100] + '...' if len(str(extracted_value)) > 100 else str(extracted_value),
-            'CT.gov': str(ctgov_value)[:100] + '...' if len(str(ctgov_value)) > 100 else str(ctgov_value),
-            'Source': source_doc,
-            'Explanation': explanation
-        })
-    
-    # Display as dataframe
-    df = pd.DataFrame(comparison_data)
+    df = build_field_comparison(unified_data, ctgov_data, api_key)
     
     # Add filters
+    # Filter on the categorical group column, which is not displayed or downloaded
+    status_group = df.pop('Status Group')
+    unique_statuses = status_group.unique().tolist()
+    
     col1, col2 = st.columns([1, 3])
     with col1:
-        # Get unique statuses from the dataframe (without confidence percentages)
-        unique_statuses = []
-        for status in df['Status'].unique():
-            # Extract just the emoji and status name (before percentage)
-            base_status = status.split(' (')[0]
-            if base_status not in unique_statuses:
-                unique_statuses.append(base_status)
-        
         status_filter = st.multiselect(
             "Filter by status",
             options=unique_statuses,
             default=unique_statuses
         )
     
-    # Apply filters
-    if status_filter:
-        # Filter by checking if the status starts with any of the selected filters
-        mask = df['Status'].apply(lambda x: any(x.startswith(f) for f in status_filter))
-        df = df[mask]
+    # Apply filters; the default selection keeps every row, so skip the scan
+    if status_filter and len(set(status_filter)) < len(unique_statuses):
+        df = df[status_group.isin(status_filter)]
     
     # Display table with column configuration
     column_config = {
@@ -218,7 +271,7 @@ def render_field_comparison(unified_data: Dict[str, Any], ctgov_data: Dict[str,
     )
     
     # Download comparison
-    csv = df.to_csv(index=False)
+    csv = comparison_csv(job_id, tuple(sorted(status_filter)), df)
     st.download_button(
         "Download Comparison CSV",
         data=csv,
@@ -226,14 +279,34 @@ def render_field_comparison(unified_data: Dict[str, Any], ctgov_data: Dict[str,
         mime="text/csv"
     )
 
+def render_partial_fields(unified_data: Dict[str, Any]):
+    """Render fields extracted so far while a job is still running"""
+    fields = unified_data.get('fields', {})
+    st.caption(f"Preview from {', '.join(unified_data.get('source_documents', []))}")
+    st.dataframe(
+        pd.DataFrame([
+            {
+                'Field': field_name,
+                'Extracted': str(field_data['value'])[:100],
+                'Source': field_data.get('source_document', 'N/A')
+            }
+            for field_name, field_data in fields.items()
+            if field_data.get('value')
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+
 def render_document_contributions(stats: Dict[str, Any]):
     """Render document contribution summary"""
     by_doc = stats.get('by_document', {})
     
     if by_doc:
         st.subheader("Field Contributions by Document Type")
-        for doc_type, count in by_doc.items():
-            percentage = (count / sum(by_doc.values())) * 100 if sum(by_doc.values()) > 0 else 0
+        total = sum(by_doc.values())
+        # Largest contributors first
+        for doc_type, count in sorted(by_doc.items(), key=lambda item: item[1], reverse=True):
+            percentage = (count / total) * 100 if total > 0 else 0
             st.metric(doc_type, f"{count} fields", f"{percentage:.1f}%")
 
 def main():
@@ -280,10 +353,11 @@ def main():
                     'failed': '❌'
                 }.get(job.status, '❓')
                 
-                if st.button(f"{status_icon} {job.nct_number} ({len(job.pdf_files)} files)", key=job_id):
+                if st.button(f"{status_icon} {job.nct_number} ({len(job.pdf_names)} files)", key=job_id):
                     st.session_state.current_job_id = job_id
     
     # Main content
+    adapter = get_pipeline_adapter()
     uploaded_files = st.file_uploader(
         "Upload Clinical Trial PDFs",
         type="pdf",
@@ -296,11 +370,9 @@ def main():
         
         # Display uploaded files
         file_info = []
-        adapter = get_pipeline_adapter()
         
         for file in uploaded_files:
-            detected_nct = adapter.extract_nct_number(file.name)
-            doc_type = adapter.determine_doc_type(file.name)
+            detected_nct, doc_type = classify_file(file.name)
             
             file_info.append({
                 'Filename': file.name,
@@ -309,7 +381,10 @@ def main():
                 'Document Type': doc_type
             })
         
-        df_files = pd.DataFrame(file_info)
+        df_files = display_table(
+            tuple(tuple(info.values()) for info in file_info),
+            tuple(file_info[0])
+        )
         st.dataframe(df_files, use_container_width=True, hide_index=True)
         
         # Extract button
@@ -334,12 +409,23 @@ def main():
             
             # Create job
             job_id = str(uuid.uuid4())
+            # Uploads are already held in memory, so getvalue() hands back the
+            # buffer without another read pass and regardless of stream position.
+            # Byte-identical uploads are extracted only once.
             pdf_files = []
-            
+            seen_digests = set()
+            duplicates = []
             for file, info in zip(uploaded_files, file_info):
-                pdf_bytes = file.read()
-                doc_type = info['Document Type']
-                pdf_files.append((file.name, pdf_bytes, doc_type))
+                pdf_bytes = file.getvalue()
+                digest = hashlib.blake2b(pdf_bytes, digest_size=16).digest()
+                if digest in seen_digests:
+                    duplicates.append(file.name)
+                    continue
+                seen_digests.add(digest)
+                pdf_files.append((file.name, pdf_bytes, info['Document Type']))
+            
+            if duplicates:
+                st.info(f"Skipping duplicate file(s): {', '.join(duplicates)}")
             
             job = ExtractionJob(
                 job_id=job_id,
@@ -348,32 +434,49 @@ def main():
                 pipeline_type=pipeline_type
             )
             
-            st.session_state.jobs[job_id] = job
+            st.session_state.jobs[job_id] = JobSummary.from_job(job)
             st.session_state.current_job_id = job_id
             
             # Run extraction with progress
-            progress_bar, status_text = create_progress_placeholder()
+            progress_bar = create_progress_placeholder()
+            preview = st.empty()
             
-            def progress_callback(progress: float, message: str):
-                update_progress(progress_bar, status_text, progress, message)
+            # Process job, showing fields as each document finishes
+            last_redraw = 0.0
+            pending = None
+            for progress, message, partial in adapter.process_job_iter(job):
+                pending = (progress, message)
+                now = time.monotonic()
+                if now - last_redraw >= PROGRESS_MIN_INTERVAL:
+                    update_progress(progress_bar, *pending)
+                    last_redraw, pending = now, None
+                if partial:
+                    with preview.container():
+                        render_partial_fields(partial['unified_data'])
+            if pending:
+                # Always show the final state
+                update_progress(progress_bar, *pending)
+            preview.empty()
             
-            # Process job
-            adapter = get_pipeline_adapter()
-            job = adapter.process_job(job, progress_callback)
+            # Keep only the summary in session state; the worker stored the job
+            st.session_state.jobs[job_id] = JobSummary.from_job(job)
             
-            # Update in session state
-            st.session_state.jobs[job_id] = job
-            
-            # Show results
+            # Show results; a failure is reported with the current job below
             if job.status == 'completed':
                 st.success("✅ Extraction completed successfully!")
                 st.rerun()
-            else:
-                st.error(f"❌ Extraction failed: {job.error}")
     
     # Display results for current job
     if st.session_state.current_job_id:
-        job = st.session_state.jobs.get(st.session_state.current_job_id)
+        summary = st.session_state.jobs.get(st.session_state.current_job_id)
+        if summary and summary.status in ('pending', 'running'):
+            # A rerun may have abandoned the progress loop; the worker still stores the job
+            stored = load_job(summary.job_id)
+            if stored:
+                summary = st.session_state.jobs[summary.job_id] = JobSummary.from_job(stored)
+        job = load_job(summary.job_id) if summary and summary.status == 'completed' else None
+        if summary and summary.status == 'failed':
+            st.error(f"❌ Extraction failed: {summary.error}")
         
         if job and job.status == 'completed':
             st.divider()
@@ -389,8 +492,7 @@ def main():
                 
                 with tab1:
                     # Show metrics
-                    adapter = get_pipeline_adapter()
-                    stats = adapter.get_comparison_stats(unified_data, ctgov_data)
+                    stats = comparison_stats(job.job_id, unified_data, ctgov_data)
                     render_comparison_metrics(stats)
                     
                     # Document contributions
@@ -398,7 +500,7 @@ def main():
                 
                 with tab2:
                     # Detailed field comparison
-                    render_field_comparison(unified_data, ctgov_data)
+                    render_field_comparison(job.job_id, unified_data, ctgov_data)
                 
                 with tab3:
                     # Statistics and insights
@@ -420,24 +522,23 @@ def main():
                     # Report path
                     report_path = job.results.get('report_path')
                     if report_path and Path(report_path).exists():
-                        with open(report_path, 'r') as f:
-                            report_content = f.read()
+                        report_mtime = os.path.getmtime(report_path)
                         
                         st.download_button(
                             "📄 Download Full Report (Markdown)",
-                            data=report_content,
+                            data=read_report(report_path, report_mtime),
                             file_name=f"{job.nct_number}_report.md",
                             mime="text/markdown"
                         )
                         
                         # Show preview
                         with st.expander("Report Preview"):
-                            st.markdown(report_content[:2000] + "..." if len(report_content) > 2000 else report_content)
+                            st.markdown(report_preview(report_path, report_mtime))
                     
                     # JSON download
                     st.download_button(
                         "📋 Download Extraction Data (JSON)",
-                        data=json.dumps(unified_data, indent=2),
+                        data=job_json(job.job_id, 'unified_data', unified_data),
                         file_name=f"{job.nct_number}_extraction.json",
                         mime="application/json"
                     )
@@ -447,9 +548,15 @@ def main():
                 st.subheader("Extraction Results")
                 
                 for filename, result in job.results.items():
-                    with st.expander(f"📄 {filename}"):
+                    # A collapsed expander still runs its body on every rerun, so
+                    # a file's details are only built once the user opens it
+                    if not st.toggle(f"📄 {filename}", key=f"open_{job.job_id}_{filename}"):
+                        continue
+                    
+                    with st.container(border=True):
                         if result['status'] == 'success':
                             extraction = result['extraction']
+                            extraction_json = job_json(job.job_id, filename, extraction)
                             
                             # Display key fields
                             col1, col2 = st.columns(2)
@@ -463,13 +570,13 @@ def main():
                                 st.write("**Phase:**", extraction.get('phase', 'N/A'))
                                 st.write("**Enrollment:**", extraction.get('enrollment', 'N/A'))
                             
-                            # Full JSON
-                            st.json(extraction, expanded=False)
+                            # Full JSON, reusing the cached serialization
+                            st.json(extraction_json.decode(), expanded=False)
                             
                             # Download
                             st.download_button(
                                 f"Download {filename} JSON",
-                                data=json.dumps(extraction, indent=2),
+                                data=extraction_json,
                                 file_name=f"{Path(filename).stem}_extraction.json",
                                 mime="application/json",
                                 key=f"download_{filename}"
@@ -12,6 +12,13 @@ import plotly.express as px
 import plotly.graph_objects as go
 from typing import Dict, List, Any
 
+# orjson is optional; it parses bytes directly and is much faster on large files
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 st.set_page_config(
     page_title="Clinical Trial Extraction Comparison", 
     layout="wide",
@@ -28,15 +35,13 @@ def load_comparison_results(results_dir: Path) -> Dict[str, Any]:
     
     # Load individual comparison files
     for json_file in results_dir.glob("NCT*_comparison.json"):
-        with open(json_file, 'r') as f:
-            nct_id = json_file.stem.replace('_comparison', '')
-            results[nct_id] = json.load(f)
+        nct_id = json_file.stem.replace('_comparison', '')
+        results[nct_id] = _loads(json_file.read_bytes())
     
     # Load batch summary if available
     summary_file = results_dir / 'batch_comparison_detailed.json'
     if summary_file.exists():
-        with open(summary_file, 'r') as f:
-            results['_summary'] = json.load(f)
+        results['_summary'] = _loads(summary_file.read_bytes())
     
     return results
 
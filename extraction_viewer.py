@@ -13,6 +13,13 @@ import plotly.graph_objects as go
 from typing import Dict, List, Any, Optional
 import csv
 
+# orjson is optional; it parses bytes directly and is much faster on large files
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 st.set_page_config(
     page_title="Clinical Trial Extraction Results", 
     layout="wide",
@@ -30,10 +37,9 @@ def load_checkpoint_data() -> Dict[str, Any]:
     
     if checkpoint_dir.exists():
         for checkpoint_file in checkpoint_dir.glob("*.json"):
-            with open(checkpoint_file, 'r') as f:
-                data = json.load(f)
-                key = f"{data['nct_number']}_{data['pdf_type']}"
-                checkpoints[key] = data
+            data = _loads(checkpoint_file.read_bytes())
+            key = f"{data['nct_number']}_{data['pdf_type']}"
+            checkpoints[key] = data
     
     return checkpoints
 
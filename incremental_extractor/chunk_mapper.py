@@ -3,9 +3,13 @@ Chunk mapping system that analyzes chunks to identify which fields they contain.
 Uses LLM to intelligently map chunks to target extraction fields.
 """
 
+import hashlib
 import json
 import logging
-from typing import List, Dict, Optional, Set
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from .intelligent_chunker import DocumentChunk
 
@@ -77,6 +81,15 @@ class ChunkMapper:
         'study_status'
     ]
     
+    # Target field list as it appears in every analysis prompt, rendered once
+    _TARGET_FIELDS_JSON = json.dumps(TARGET_FIELDS, indent=2)
+    
+    # Upper bound on chunk analyses in flight at once
+    MAX_CONCURRENT_REQUESTS = 8
+    
+    # Chunk analyses kept in memory, least recently used evicted first
+    CACHE_SIZE = 4096
+    
     def __init__(self, model: str = "gpt-3.5-turbo"):
         """
         Initialize the chunk mapper.
@@ -88,6 +101,11 @@ class ChunkMapper:
         if not client:
             logger.warning("OpenAI not available, chunk mapping will be disabled")
         
+        # In-memory LRU cache so re-processing a document doesn't re-map identical
+        # chunks; analyze_chunks fills it from several threads, hence the lock
+        self._cache: "OrderedDict[str, Tuple[List[str], Dict[str, float], List[str]]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
     def analyze_chunk(self, chunk: DocumentChunk) -> ChunkMapping:
         """
         Analyze a single chunk to identify which fields it contains.
@@ -110,6 +128,21 @@ class ChunkMapper:
         # Prepare the analysis prompt
         prompt = self._create_analysis_prompt(chunk.text)
         
+        # Check cache first; chunk ids depend on position, so only the analysis is cached
+        cache_key = self._get_cache_key(prompt)
+        with self._cache_lock:
+            cached = self._cache.get(cache_key)
+            if cached is not None:
+                self._cache.move_to_end(cache_key)
+        if cached is not None:
+            fields, confidence, sections = cached
+            return ChunkMapping(
+                chunk_id=chunk.chunk_id,
+                identified_fields=list(fields),
+                confidence_scores=dict(confidence),
+                relevant_sections=list(sections)
+            )
+        
         try:
             # Using new OpenAI API
             response = client.chat.completions.create(
@@ -133,6 +166,18 @@ class ChunkMapper:
                 relevant_sections=result.get('sections', [])
             )
             
+            # Cache copies so callers mutating the mapping can't alter later hits
+            analysis = (
+                list(mapping.identified_fields),
+                dict(mapping.confidence_scores),
+                list(mapping.relevant_sections)
+            )
+            with self._cache_lock:
+                self._cache[cache_key] = analysis
+                self._cache.move_to_end(cache_key)
+                if len(self._cache) > self.CACHE_SIZE:
+                    self._cache.popitem(last=False)
+            
             logger.debug(f"Chunk {chunk.chunk_id} contains fields: {mapping.identified_fields}")
             return mapping
             
@@ -150,20 +195,23 @@ class ChunkMapper:
         """
         Analyze multiple chunks in batch.
         
+        Each chunk is an independent OpenAI request, so up to
+        MAX_CONCURRENT_REQUESTS run at once instead of one after another.
+        
         Args:
             chunks: List of document chunks
             
         Returns:
-            List of chunk mappings
+            List of chunk mappings, in the same order as the chunks
         """
-        mappings = []
+        logger.info(f"Analyzing {len(chunks)} chunks")
         
-        for i, chunk in enumerate(chunks):
-            logger.info(f"Analyzing chunk {i+1}/{len(chunks)}")
-            mapping = self.analyze_chunk(chunk)
-            mappings.append(mapping)
+        if not client or len(chunks) <= 1:
+            return [self.analyze_chunk(chunk) for chunk in chunks]
         
-        return mappings
+        workers = min(self.MAX_CONCURRENT_REQUESTS, len(chunks))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(self.analyze_chunk, chunks))
     
     def get_best_chunk_for_field(self, field_name: str, 
                                 mappings: List[ChunkMapping]) -> Optional[int]:
@@ -233,7 +281,7 @@ class ChunkMapper:
         prompt = f"""Analyze this chunk of a clinical trial document and identify which fields it contains.
 
 Target fields to look for:
-{json.dumps(self.TARGET_FIELDS, indent=2)}
+{self._TARGET_FIELDS_JSON}
 
 Chunk text:
 \"\"\"
@@ -261,6 +309,17 @@ Example response:
         
         return prompt
     
+    def _get_cache_key(self, prompt: str) -> str:
+        """Generate cache key for a chunk analysis"""
+        # The prompt embeds the chunk text and target fields, so it covers prompt changes too
+        return hashlib.sha256(f"{self.model}|{prompt}".encode()).hexdigest()
+    
+    def clear_cache(self):
+        """Clear the chunk mapping cache"""
+        with self._cache_lock:
+            self._cache.clear()
+        logger.info("Chunk mapping cache cleared")
+    
     def create_extraction_plan(self, mappings: List[ChunkMapping]) -> Dict[str, int]:
         """
         Create a plan for which chunk to use for each field extraction.
@@ -0,0 +1,25 @@
+"""Cached access to ClinicalTrials.gov export CSVs"""
+import csv
+import os
+from functools import lru_cache
+from typing import Dict
+
+
+@lru_cache(maxsize=128)
+def _read_first_row(csv_path: str, mtime_ns: int) -> Dict[str, str]:
+    """Parse the first data row; mtime_ns is part of the key so edits invalidate it"""
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.DictReader(f)
+        return next(reader, {})
+
+
+def load_ctgov_row(csv_path) -> Dict[str, str]:
+    """
+    Return the study row of a CT.gov CSV export.
+
+    Parsed rows are cached per (path, modification time), so repeated jobs and
+    every document within a job reuse one parse until the file changes. A copy
+    is returned so callers may modify it freely.
+    """
+    csv_path = os.fspath(csv_path)
+    return dict(_read_first_row(csv_path, os.stat(csv_path).st_mtime_ns))
@@ -4,13 +4,14 @@ import logging
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 
-from .pdf_extractor import extract_text_from_pdf
+from .ctgov_data import load_ctgov_row
+from .pdf_extractor import extract_text_from_pdf, extract_text_from_pdf_bytes
 from .schema import (
     ExtractionCheckpoint, ExtractionStatus, FieldExtraction,
     ComparisonResult, StudyComparison, CTGOV_FIELD_MAPPING, PRIORITY_FIELDS
 )
 from .enhanced_prompt_builder_v2 import EnhancedPromptBuilderV2 as EnhancedPromptBuilder
-from .intelligent_comparator import IntelligentComparator
+from .intelligent_comparator import get_comparator
 from .smart_outcome_extractor import SmartOutcomeExtractor
 from .smart_validator import SmartValidator
 from .filename_extractor import FilenameExtractor
@@ -31,15 +32,15 @@ class IncrementalExtractor:
         if not self.api_key:
             raise ValueError("OpenAI API key must be provided or set in API_KEY or OPENAI_API_KEY environment variable")
         
-        # Initialize OpenAI
+        # Initialize OpenAI; the client and its connection pool are shared per key
         try:
-            from openai import OpenAI
-            self.client = OpenAI(api_key=self.api_key)
+            from .openai_client import get_client
+            self.client = get_client(self.api_key)
         except ImportError:
             raise ImportError("openai package is required. Install with: pip install openai")
         
         # Initialize intelligent comparator
-        self.comparator = IntelligentComparator(self.api_key)
+        self.comparator = get_comparator(self.api_key)
         
         # Initialize smart outcome extractor
         self.smart_outcome_extractor = SmartOutcomeExtractor(self.api_key)
@@ -84,6 +85,38 @@ class IncrementalExtractor:
         logger.info("Extracting text from PDF...")
         pdf_text = extract_text_from_pdf(pdf_path)
         
+        return self._extract_from_text(pdf_text, pdf_path, nct_number, pdf_type,
+                                       compare_immediately, ctgov_csv_path)
+    
+    def extract_from_bytes(self, pdf_bytes: bytes, filename: str, nct_number: str, pdf_type: str,
+                           compare_immediately: bool = True,
+                           ctgov_csv_path: Optional[str] = None) -> ExtractionCheckpoint:
+        """
+        Extract fields from an in-memory PDF, e.g. an upload, without staging it on disk.
+        
+        Args:
+            pdf_bytes: Raw PDF content
+            filename: Original filename; used for filename hints and recorded as pdf_path
+            nct_number: NCT number for the study
+            pdf_type: Type of PDF (Protocol, SAP, ICF)
+            compare_immediately: Whether to compare with CT.gov data after each extraction
+            ctgov_csv_path: Path to CT.gov CSV for immediate comparison
+            
+        Returns:
+            ExtractionCheckpoint with results
+        """
+        logger.info(f"Starting extraction for {nct_number} from {pdf_type} PDF ({filename})")
+        
+        logger.info("Extracting text from PDF...")
+        pdf_text = extract_text_from_pdf_bytes(pdf_bytes, filename)
+        
+        return self._extract_from_text(pdf_text, filename, nct_number, pdf_type,
+                                       compare_immediately, ctgov_csv_path)
+    
+    def _extract_from_text(self, pdf_text: str, pdf_path: str, nct_number: str, pdf_type: str,
+                           compare_immediately: bool,
+                           ctgov_csv_path: Optional[str]) -> ExtractionCheckpoint:
+        """Run field extraction over already-extracted document text"""
         # Create extraction result container
         checkpoint = ExtractionCheckpoint(
             nct_number=nct_number,
@@ -372,12 +405,7 @@ class IncrementalExtractor:
     def _load_ctgov_data(self, csv_path: str) -> Dict[str, str]:
         """Load CT.gov data from CSV"""
         try:
-            import csv
-            with open(csv_path, 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    return row
-            return {}
+            return load_ctgov_row(csv_path)
         except Exception as e:
             logger.error(f"Error loading CT.gov CSV: {e}")
             return {}
@@ -40,16 +40,28 @@ class IntelligentChunker:
     - Semantic coherence
     """
     
-    def __init__(self, chunk_size: int = 50000, overlap_size: int = 1000):
+    def __init__(self, chunk_size: int = 50000, overlap_size: int = 1000,
+                 stride: Optional[int] = None):
         """
         Initialize the chunker.
         
         Args:
             chunk_size: Target size for each chunk in characters
             overlap_size: Number of overlapping characters between chunks
+            stride: Distance between chunk starts; overrides overlap_size
+                (overlap = chunk_size - stride) when given
         """
+        if stride is not None:
+            if not 0 < stride <= chunk_size:
+                raise ValueError(f"stride must be in (0, {chunk_size}], got {stride}")
+            overlap_size = chunk_size - stride
         self.chunk_size = chunk_size
         self.overlap_size = overlap_size
+    
+    @property
+    def stride(self) -> int:
+        """Distance between the starts of consecutive unsnapped chunks"""
+        return self.chunk_size - self.overlap_size
         
     def chunk_document(self, text: str, page_breaks: Optional[List[int]] = None) -> List[DocumentChunk]:
         """
@@ -103,13 +115,14 @@ class IntelligentChunker:
             
             logger.debug(f"Created chunk {chunk_id}: chars {start_pos}-{end_pos}, pages {page_numbers}")
             
-            # Move to next chunk with overlap
-            start_pos = end_pos - self.overlap_size
-            chunk_id += 1
-            
             # Prevent infinite loop on small documents
             if end_pos >= len(text):
                 break
+            
+            # Move to next chunk with overlap; a chunk snapped back to an early
+            # break must still advance, or the same window would repeat forever
+            start_pos = max(end_pos - self.overlap_size, start_pos + 1)
+            chunk_id += 1
         
         logger.info(f"Split document into {len(chunks)} chunks")
         return chunks
@@ -1,15 +1,131 @@
 """Intelligent comparison using LLM for semantic matching"""
+import hashlib
+import json
 import logging
-from typing import Tuple, Optional
-from openai import OpenAI
+import os
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import List, Tuple, Optional
+
+from .openai_client import get_client
 
 logger = logging.getLogger(__name__)
 
+# Next to the checkpoints the pipelines write, regardless of the working
+# directory; COMPARATOR_CACHE_DIR overrides it
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / "checkpoints" / "comparator_cache"
+
+# What counts as equivalent; shared by the single and batched prompts
+_EQUIVALENCE_GUIDELINES = """Consider the following:
+1. Different formats (e.g., "Phase 2" vs "PHASE2" vs "Phase II")
+2. Abbreviations (e.g., "ICG" vs "Indocyanine Green")
+3. Additional details in one value (e.g., "DRUG: ICG" vs "ICG")
+4. Status variations (e.g., "Recruiting" vs "ACTIVE_NOT_RECRUITING" - these are different!)
+5. Partial information (longer title in one vs shortened in other)
+6. Formatting differences (e.g., "PharmaMar" vs "Pharma Mar S.A.")
+7. Age equivalencies (e.g., "Children" = "0-17 years" = "CHILD", "Adults" = "18+ years" = "ADULT")
+8. Intervention types (e.g., "antibiotic guidelines" = "BEHAVIORAL: antibiotic guidelines")"""
+
+_SYSTEM_MESSAGE = {
+    "role": "system",
+    "content": "You are a precise clinical trial data comparison expert. Respond only with the requested JSON format."
+}
+
 class IntelligentComparator:
     """Use LLM to determine if extracted values match CT.gov values semantically"""
     
-    def __init__(self, api_key: str):
-        self.client = OpenAI(api_key=api_key)
+    # Comparisons sent per batched request; keeps the response well inside max_tokens
+    BATCH_SIZE = 20
+    
+    MODEL = "gpt-3.5-turbo"
+    # Bump whenever the comparison prompts change so cached verdicts are not reused
+    PROMPT_VERSION = 1
+    
+    # Entries kept in the in-memory layer; the comparator is shared process-wide
+    MEMORY_CACHE_SIZE = 4096
+    
+    def __init__(self, api_key: str, cache_dir: Optional[str] = None):
+        """
+        Args:
+            api_key: OpenAI API key
+            cache_dir: Where LLM comparison results persist between runs. Defaults to
+                COMPARATOR_CACHE_DIR, else DEFAULT_CACHE_DIR; COMPARATOR_CACHE_DISABLE=1
+                in the environment turns the disk cache off
+        """
+        self.client = get_client(api_key)
+        
+        if os.getenv("COMPARATOR_CACHE_DISABLE") == "1":
+            self.cache_dir = None
+        else:
+            self.cache_dir = Path(cache_dir or os.getenv("COMPARATOR_CACHE_DIR") or DEFAULT_CACHE_DIR)
+        
+        # Bounded LRU layer in front of the disk cache
+        self._cache: "OrderedDict[str, Tuple[bool, float, str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+    
+    @classmethod
+    def _cache_key(cls, field_name: str, extracted_value: str, ctgov_value: str) -> str:
+        """Generate cache key for a comparison, tied to the model and prompt version"""
+        return hashlib.sha256(
+            f"{cls.MODEL}\x1f{cls.PROMPT_VERSION}\x1f{field_name}\x1f{extracted_value}\x1f{ctgov_value}".encode()
+        ).hexdigest()
+    
+    def _remember(self, key: str, result: Tuple[bool, float, str]) -> None:
+        """Add a result to the in-memory layer, evicting the least recently used"""
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.MEMORY_CACHE_SIZE:
+                self._cache.popitem(last=False)
+    
+    def _cache_get(self, key: str) -> Optional[Tuple[bool, float, str]]:
+        """Cached LLM result for a comparison, from memory or disk"""
+        with self._cache_lock:
+            result = self._cache.get(key)
+            if result is not None:
+                self._cache.move_to_end(key)
+                return result
+        if self.cache_dir is None:
+            return None
+        
+        try:
+            match, confidence, explanation = json.loads((self.cache_dir / key[:2] / f"{key}.json").read_text())
+        except (OSError, ValueError):
+            return None
+        
+        result = (match, confidence, explanation)
+        self._remember(key, result)
+        return result
+    
+    def _cache_put(self, key: str, result: Tuple[bool, float, str]) -> None:
+        """Remember an LLM result in memory and on disk"""
+        self._remember(key, result)
+        if self.cache_dir is None:
+            return
+        
+        try:
+            path = self.cache_dir / key[:2] / f"{key}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent runs never read a partial entry
+            tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp_path.write_text(json.dumps(list(result)))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"Could not write comparison cache entry: {e}")
+    
+    @staticmethod
+    def _compare_locally(extracted_value: str, ctgov_value: str) -> Optional[Tuple[bool, float, str]]:
+        """Result for comparisons that need no LLM call, or None if one is needed"""
+        if not extracted_value or not ctgov_value:
+            return False, 0.0, "One or both values are empty"
+        
+        # Special handling for exact matches
+        if extracted_value.strip().lower() == ctgov_value.strip().lower():
+            return True, 1.0, "Exact match"
+        
+        return None
     
     def compare_fields(self, field_name: str, extracted_value: str, 
                       ctgov_value: str) -> Tuple[bool, float, str]:
@@ -19,12 +135,15 @@ class IntelligentComparator:
         Returns:
             Tuple of (match: bool, confidence: float, explanation: str)
         """
-        if not extracted_value or not ctgov_value:
-            return False, 0.0, "One or both values are empty"
+        local = self._compare_locally(extracted_value, ctgov_value)
+        if local is not None:
+            return local
         
-        # Special handling for exact matches
-        if extracted_value.strip().lower() == ctgov_value.strip().lower():
-            return True, 1.0, "Exact match"
+        # Check cache first
+        cache_key = self._cache_key(field_name, extracted_value, ctgov_value)
+        cached = self._cache_get(cache_key)
+        if cached is not None:
+            return cached
         
         prompt = f"""You are a clinical trial data comparison expert. Your job is to determine if two values for the same field are semantically equivalent, even if they have different formats or wording.
 
@@ -32,15 +151,7 @@ Field: {field_name}
 Value 1 (Extracted from PDF): {extracted_value}
 Value 2 (From ClinicalTrials.gov): {ctgov_value}
 
-Consider the following:
-1. Different formats (e.g., "Phase 2" vs "PHASE2" vs "Phase II")
-2. Abbreviations (e.g., "ICG" vs "Indocyanine Green")
-3. Additional details in one value (e.g., "DRUG: ICG" vs "ICG")
-4. Status variations (e.g., "Recruiting" vs "ACTIVE_NOT_RECRUITING" - these are different!)
-5. Partial information (longer title in one vs shortened in other)
-6. Formatting differences (e.g., "PharmaMar" vs "Pharma Mar S.A.")
-7. Age equivalencies (e.g., "Children" = "0-17 years" = "CHILD", "Adults" = "18+ years" = "ADULT")
-8. Intervention types (e.g., "antibiotic guidelines" = "BEHAVIORAL: antibiotic guidelines")
+{_EQUIVALENCE_GUIDELINES}
 
 Respond with ONLY a JSON object in this format:
 {{"match": true/false, "confidence": 0.0-1.0, "explanation": "brief explanation"}}
@@ -53,9 +164,9 @@ Examples:
 
         try:
             response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+                model=self.MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a precise clinical trial data comparison expert. Respond only with the requested JSON format."},
+                    _SYSTEM_MESSAGE,
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.1,
@@ -65,10 +176,11 @@ Examples:
             result_text = response.choices[0].message.content.strip()
             
             # Parse JSON response
-            import json
             try:
                 result = json.loads(result_text)
-                return result['match'], result['confidence'], result['explanation']
+                comparison = (result['match'], result['confidence'], result['explanation'])
+                self._cache_put(cache_key, comparison)
+                return comparison
             except json.JSONDecodeError:
                 logger.error(f"Failed to parse JSON response: {result_text}")
                 return False, 0.0, "Failed to parse comparison result"
@@ -78,10 +190,92 @@ Examples:
             # Fallback to simple comparison
             return False, 0.0, f"Comparison error: {str(e)}"
     
+    def compare_fields_batch(self, items: List[Tuple[str, str, str]]) -> List[Tuple[bool, float, str]]:
+        """
+        Compare many (field_name, extracted_value, ctgov_value) triples.
+        
+        Pairs that are empty, match exactly or are cached are settled locally;
+        the rest go to the LLM BATCH_SIZE at a time in one request each instead of one
+        request per field. A batch whose response can't be used falls back to
+        compare_fields for its items.
+        
+        Returns:
+            One (match, confidence, explanation) tuple per item, in order
+        """
+        results: List[Optional[Tuple[bool, float, str]]] = [
+            self._compare_locally(extracted_value, ctgov_value)
+            or self._cache_get(self._cache_key(field_name, extracted_value, ctgov_value))
+            for field_name, extracted_value, ctgov_value in items
+        ]
+        pending = [i for i, result in enumerate(results) if result is None]
+        
+        for start in range(0, len(pending), self.BATCH_SIZE):
+            batch = pending[start:start + self.BATCH_SIZE]
+            batch_results = self._compare_batch([items[i] for i in batch])
+            for i, result in zip(batch, batch_results):
+                results[i] = result
+        
+        return results
+    
+    def _compare_batch(self, items: List[Tuple[str, str, str]]) -> List[Tuple[bool, float, str]]:
+        """Compare one batch with a single LLM request"""
+        numbered = "\n\n".join(
+            f"{n}. Field: {field_name}\n"
+            f"   Value 1 (Extracted from PDF): {extracted_value}\n"
+            f"   Value 2 (From ClinicalTrials.gov): {ctgov_value}"
+            for n, (field_name, extracted_value, ctgov_value) in enumerate(items, start=1)
+        )
+        
+        prompt = f"""You are a clinical trial data comparison expert. For each numbered comparison below, determine if the two values for the same field are semantically equivalent, even if they have different formats or wording.
+
+{numbered}
+
+{_EQUIVALENCE_GUIDELINES}
+
+Respond with ONLY a JSON object in this format, with exactly one result per comparison, in the same order:
+{{"results": [{{"match": true/false, "confidence": 0.0-1.0, "explanation": "brief explanation"}}, ...]}}
+"""
+        
+        try:
+            response = self.client.chat.completions.create(
+                model=self.MODEL,
+                messages=[
+                    _SYSTEM_MESSAGE,
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.1,
+                max_tokens=150 * len(items),
+                response_format={"type": "json_object"}
+            )
+            
+            results = json.loads(response.choices[0].message.content)["results"]
+            if len(results) != len(items):
+                raise ValueError(f"expected {len(items)} results, got {len(results)}")
+            comparisons = [(r['match'], r['confidence'], r['explanation']) for r in results]
+            
+        except Exception as e:
+            logger.error(f"Batch comparison failed, comparing fields one by one: {e}")
+            return [self.compare_fields(*item) for item in items]
+        
+        for item, comparison in zip(items, comparisons):
+            self._cache_put(self._cache_key(*item), comparison)
+        return comparisons
+    
     def get_match_summary(self, extracted_value: str, ctgov_value: str,
                          match: bool, confidence: float, explanation: str) -> str:
         """Format a nice summary of the comparison"""
         if match:
             return f"MATCH (confidence: {confidence:.0%}) - {explanation}"
         else:
-            return f"MISMATCH (confidence: {confidence:.0%}) - {explanation}"
\ No newline at end of file
+            return f"MISMATCH (confidence: {confidence:.0%}) - {explanation}"
+
+
+@lru_cache(maxsize=4)
+def get_comparator(api_key: str) -> IntelligentComparator:
+    """
+    Return the comparator for an API key, creating it on first use.
+
+    Sharing one per key lets every extractor and trial in a process reuse its
+    OpenAI client and in-memory comparison cache.
+    """
+    return IntelligentComparator(api_key)
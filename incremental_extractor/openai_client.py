@@ -0,0 +1,16 @@
+"""Shared OpenAI clients"""
+from functools import lru_cache
+
+from openai import OpenAI
+
+
+@lru_cache(maxsize=4)
+def get_client(api_key: str) -> OpenAI:
+    """
+    Return the OpenAI client for an API key, creating it on first use.
+
+    Each client owns an HTTP connection pool, so sharing one per key lets
+    keep-alive connections (and their TLS sessions) be reused across
+    extractor instances instead of being re-established per document.
+    """
+    return OpenAI(api_key=api_key)
@@ -1,6 +1,7 @@
 """Fast PDF text extraction using PyPDF2 with fallback to pdfplumber"""
+import io
 import logging
-from typing import Optional
+from typing import Optional, Union
 import os
 
 logger = logging.getLogger(__name__)
@@ -18,13 +19,36 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
     
+    return _extract_text(pdf_path, pdf_path)
+
+def extract_text_from_pdf_bytes(pdf_bytes: bytes, name: str = "<memory>") -> str:
+    """
+    Extract text from an in-memory PDF without writing it to disk.
+    
+    Args:
+        pdf_bytes: Raw PDF content
+        name: Label used in log messages (e.g. the uploaded filename)
+        
+    Returns:
+        Extracted text from the PDF
+    """
+    return _extract_text(pdf_bytes, name)
+
+def _open(source: Union[str, bytes]):
+    """Open a path, or wrap raw bytes in a fresh read-only stream"""
+    if isinstance(source, bytes):
+        return io.BytesIO(source)
+    return open(source, 'rb')
+
+def _extract_text(source: Union[str, bytes], name: str) -> str:
+    """Shared PyPDF2/pdfplumber extraction for a file path or raw PDF bytes"""
     # Try PyPDF2 first (faster)
     try:
         import PyPDF2
-        logger.info(f"Extracting text from {pdf_path} using PyPDF2...")
+        logger.info(f"Extracting text from {name} using PyPDF2...")
         
         text_parts = []
-        with open(pdf_path, 'rb') as file:
+        with _open(source) as file:
             pdf_reader = PyPDF2.PdfReader(file)
             num_pages = len(pdf_reader.pages)
             logger.info(f"PDF has {num_pages} pages")
@@ -49,10 +73,10 @@ def extract_text_from_pdf(pdf_path: str) -> str:
     # Fallback to pdfplumber
     try:
         import pdfplumber
-        logger.info(f"Extracting text from {pdf_path} using pdfplumber...")
+        logger.info(f"Extracting text from {name} using pdfplumber...")
         
         text_parts = []
-        with pdfplumber.open(pdf_path) as pdf:
+        with pdfplumber.open(source if isinstance(source, str) else io.BytesIO(source)) as pdf:
             num_pages = len(pdf.pages)
             logger.info(f"PDF has {num_pages} pages")
             
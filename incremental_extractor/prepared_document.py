@@ -0,0 +1,149 @@
+"""Per-document text views shared by the validators"""
+import re
+import threading
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Optional
+
+# Aho-Corasick is optional: without it every term lookup is a plain substring scan
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# Anything that is neither a word character nor whitespace
+_PUNCT_RE = re.compile(r'[^\w\s]')
+
+
+def scrub(text: str) -> str:
+    """Replace punctuation with spaces"""
+    return _PUNCT_RE.sub(' ', text)
+
+
+def _find_nct_digits(doc_lower: str) -> FrozenSet[str]:
+    """
+    Collect the digit part of every NCT number in a lowercased document.
+
+    Accepts the forms documents use: nct12345678, nct 12345678 and nct-12345678.
+    """
+    digits = set()
+    pos = doc_lower.find('nct')
+    while pos != -1:
+        start = pos + 3
+        # Skip an optional single separator after the prefix
+        if doc_lower[start:start + 1] in (' ', '-'):
+            start += 1
+        tail = doc_lower[start:start + 8]
+        if len(tail) == 8 and tail.isdecimal():
+            digits.add(tail)
+        pos = doc_lower.find('nct', pos + 3)
+    return frozenset(digits)
+
+
+class PreparedDocument:
+    """Document text plus derived forms that are expensive to recompute per field"""
+
+    __slots__ = (
+        "text", "lower", "memo",
+        "_indexed", "_present", "_nct_digits", "_charset", "_scrubbed_lower",
+    )
+
+    def __init__(self, text: str):
+        self.text = text
+        self.lower = text.lower()
+        self.memo: Dict[Hashable, Any] = {}  # validator results for this document
+        self._indexed = set()  # lowercased terms whose presence is already known
+        self._present = set()  # subset of _indexed that occurs in the document
+        self._nct_digits = None
+        self._charset = None
+        self._scrubbed_lower = None
+
+    def index_terms(self, terms: Iterable[str]) -> None:
+        """
+        Look up many lowercased terms with a single Aho-Corasick pass over the document.
+
+        Later `contains` calls for these terms become set lookups instead of full
+        document scans. Does nothing when pyahocorasick is not installed.
+        """
+        if ahocorasick is None:
+            return
+
+        # Terms using a character the document lacks cannot match, and contains()
+        # already rejects them cheaply, so they stay out of the automaton
+        charset = self.charset
+        pending = {
+            term for term in terms
+            if term and term not in self._indexed and charset.issuperset(term)
+        }
+        if not pending:
+            return
+
+        automaton = ahocorasick.Automaton()
+        for term in pending:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+
+        present = set()
+        for _, term in automaton.iter(self.lower):
+            present.add(term)
+
+        # Record hits before marking terms as indexed so readers never see a
+        # term as indexed but missing from _present
+        self._present |= present
+        self._indexed |= pending
+
+    @property
+    def charset(self) -> FrozenSet[str]:
+        """Every character occurring in the lowercased document"""
+        if self._charset is None:
+            self._charset = frozenset(self.lower)
+        return self._charset
+
+    @property
+    def scrubbed_lower(self) -> str:
+        """Lowercased document with punctuation replaced by spaces"""
+        if self._scrubbed_lower is None:
+            self._scrubbed_lower = scrub(self.text).lower()
+        return self._scrubbed_lower
+
+    @property
+    def nct_digits(self) -> FrozenSet[str]:
+        """Digit parts of every NCT number in the document, found in one pass"""
+        if self._nct_digits is None:
+            self._nct_digits = _find_nct_digits(self.lower)
+        return self._nct_digits
+
+    def contains(self, term_lower: str) -> bool:
+        """Check whether an already-lowercased term occurs in the lowercased document"""
+        if term_lower in self._indexed:
+            return term_lower in self._present
+        # Quick reject: a term with a character absent from the document can't match
+        if not self.charset.issuperset(term_lower):
+            return False
+        return term_lower in self.lower
+
+
+class PreparedCache(threading.local):
+    """
+    Per-thread slot for the document a validator is currently working on.
+
+    One validator can then serve documents extracted concurrently on several
+    threads without each thread evicting the others' cached views.
+    """
+    prepared: Optional[PreparedDocument] = None
+
+
+def prepare(holder, document: str) -> PreparedDocument:
+    """
+    Return the PreparedDocument for `document`, reusing the one cached on `holder`.
+
+    The cache is keyed on object identity, so a batch over one document pays for
+    `document.lower()` once instead of once per candidate substring. The slot is
+    per thread (see PreparedCache), so each thread keeps its own current document
+    and threads never see or replace each other's entries.
+    """
+    cache = holder._prepared
+    prepared = cache.prepared
+    if prepared is None or prepared.text is not document:
+        # A new document also starts a fresh memo
+        prepared = PreparedDocument(document)
+        cache.prepared = prepared
+    return prepared
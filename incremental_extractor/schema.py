@@ -47,6 +47,25 @@ class ExtractionCheckpoint(BaseModel):
         if self.total_fields == 0:
             return 0.0
         return (self.completed_fields + self.failed_fields + self.skipped_fields) / self.total_fields * 100
+    
+    def to_extraction_dict(self) -> Dict[str, Any]:
+        """Plain-dict form consumed by EnhancedUnifiedExtractor.merge_extractions"""
+        return {
+            'nct_number': self.nct_number,
+            'pdf_type': self.pdf_type,
+            'pdf_path': self.pdf_path,
+            'fields': {
+                field_name: {
+                    'value': field.value,
+                    'status': field.status.value,
+                    'extraction_time': field.extraction_time.isoformat() if field.extraction_time else None
+                }
+                for field_name, field in self.fields.items()
+            },
+            'completed_fields': self.completed_fields,
+            'total_fields': self.total_fields,
+            'progress_percentage': self.progress_percentage
+        }
 
 class ComparisonResult(BaseModel):
     """Result of comparing extracted data with CT.gov data"""
@@ -1,20 +1,50 @@
 """Simple validation module that just checks if values exist in the document"""
 import logging
-import re
 from typing import Dict, List, Optional, Tuple
 
+from .prepared_document import PreparedCache, prepare
+
 logger = logging.getLogger(__name__)
 
+# Fields that can have multiple values separated by semicolons/commas
+_MULTI_VALUE_FIELDS = frozenset({
+    "sponsor", "collaborators", "conditions", "interventions", 
+    "locations", "primary_outcome_measures", "secondary_outcome_measures",
+    "other_outcome_measures"
+})
+
+# Common prefixes that LLMs add to intervention names
+_PREFIXES = ("Drug:", "Device:", "Procedure:", "Behavioral:", "Other:", "Treatment:")
+
+# Treat ';' and ',' alike when splitting multi-value fields
+_SEP_TRANS = str.maketrans(";", ",")
+
+
+def _split_values(value: str) -> List[str]:
+    """Split a multi-value field on ';' or ',' into stripped, non-empty parts"""
+    return [part.strip() for part in value.translate(_SEP_TRANS).split(",") if part.strip()]
+
+
+def _strip_prefix(text: str) -> Optional[str]:
+    """Return text without its LLM-added prefix, or None if it has none"""
+    # One C-level check for the common case of no prefix at all
+    if not text.startswith(_PREFIXES):
+        return None
+    for prefix in _PREFIXES:
+        if text.startswith(prefix):
+            return text[len(prefix):].strip()
+    return None
+
+
 class SimpleValidator:
     """Simple validator that just verifies text exists in document"""
     
     def __init__(self):
-        # Fields that can have multiple values separated by semicolons/commas
-        self.multi_value_fields = {
-            "sponsor", "collaborators", "conditions", "interventions", 
-            "locations", "primary_outcome_measures", "secondary_outcome_measures",
-            "other_outcome_measures"
-        }
+        self._prepared = PreparedCache()
+    
+    def clear_cache(self) -> None:
+        """Drop the cached document views and memoized results"""
+        self._prepared = PreparedCache()
     
     def validate_extraction(self, field_name: str, extracted_value: Optional[str], 
                           document_text: str, llm_response: Optional[str] = None) -> Tuple[bool, Optional[str]]:
@@ -33,15 +63,24 @@ class SimpleValidator:
         if not extracted_value or extracted_value.upper() in ["NOT_FOUND", "NONE", "N/A"]:
             return True, None
         
+        # Reuse the result when the same value was already validated against this document
+        memo = prepare(self, document_text).memo
+        key = ("validate", field_name, extracted_value)
+        if key not in memo:
+            memo[key] = self._validate_value(field_name, extracted_value, document_text)
+        return memo[key]
+    
+    def _validate_value(self, field_name: str, extracted_value: str,
+                        document_text: str) -> Tuple[bool, Optional[str]]:
+        """Validate a non-empty value (uncached)"""
         # For multi-value fields, check if at least some parts exist
-        if field_name in self.multi_value_fields:
+        if field_name in _MULTI_VALUE_FIELDS:
             # Split by common separators
-            parts = re.split(r'[;,]\s*', extracted_value)
+            parts = _split_values(extracted_value)
             found_parts = 0
             
             for part in parts:
-                part = part.strip()
-                if part and self._text_exists_in_document(part, document_text):
+                if self._text_exists_in_document(part, document_text):
                     found_parts += 1
             
             if found_parts == 0:
@@ -59,45 +98,74 @@ class SimpleValidator:
     
     def _text_exists_in_document(self, text: str, document: str) -> bool:
         """Check if text exists in document, with some flexibility"""
+        memo = prepare(self, document).memo
+        key = ("exists", text)
+        if key not in memo:
+            memo[key] = self._find_text(text, document)
+        return memo[key]
+    
+    def _find_text(self, text: str, document: str) -> bool:
+        """Look for text in the document (uncached)"""
+        prepared = prepare(self, document)
+        
         # Direct check
         if text in document:
             return True
         
         # Case-insensitive check
-        if text.lower() in document.lower():
+        if prepared.contains(text.lower()):
             return True
         
         # Check without common prefixes that LLMs add
-        prefixes_to_remove = ["Drug:", "Device:", "Procedure:", "Behavioral:", "Other:", "Treatment:"]
-        for prefix in prefixes_to_remove:
-            if text.startswith(prefix):
-                clean_text = text[len(prefix):].strip()
-                if clean_text in document or clean_text.lower() in document.lower():
-                    return True
-                
-                # Also check for partial matches for drug names
-                # e.g., "Lurbinectedin 3.2 mg/m2" should match if "Lurbinectedin" exists
-                parts = clean_text.split()
-                if parts and (parts[0] in document or parts[0].lower() in document.lower()):
-                    return True
+        clean_text = _strip_prefix(text)
+        if clean_text is not None:
+            if clean_text in document or prepared.contains(clean_text.lower()):
+                return True
+            
+            # Also check for partial matches for drug names
+            # e.g., "Lurbinectedin 3.2 mg/m2" should match if "Lurbinectedin" exists
+            parts = clean_text.split()
+            if parts and (parts[0] in document or prepared.contains(parts[0].lower())):
+                return True
         
-        # For NCT numbers specifically, check multiple formats
-        if re.match(r'^NCT\d{8}$', text):
-            # Check with spaces, dashes, etc.
-            variants = [
-                text,
-                text[:3] + " " + text[3:],  # NCT 12345678
-                text[:3] + "-" + text[3:],  # NCT-12345678
-            ]
-            for variant in variants:
-                if variant in document or variant.lower() in document.lower():
-                    return True
+        # For NCT numbers specifically, also accept "NCT 12345678" and "NCT-12345678"
+        if len(text) == 11 and text[:3] == "NCT" and text[3:].isdecimal():
+            if text[3:] in prepared.nct_digits:
+                return True
         
         return False
     
+    def _candidate_terms(self, field_name: str, value: Optional[str]) -> List[str]:
+        """Lowercased terms that validate_extraction will look up for this value"""
+        if not value or value.upper() in ["NOT_FOUND", "NONE", "N/A"]:
+            return []
+        
+        if field_name in _MULTI_VALUE_FIELDS:
+            texts = _split_values(value)
+        else:
+            texts = [value]
+        
+        terms = []
+        for text in texts:
+            terms.append(text.lower())
+            clean_text = _strip_prefix(text)
+            if clean_text is not None:
+                terms.append(clean_text.lower())
+                words = clean_text.split()
+                if words:
+                    terms.append(words[0].lower())
+        return terms
+    
     def batch_validate(self, extracted_values: Dict[str, Optional[str]], 
                       document_text: str) -> Dict[str, Tuple[bool, Optional[str]]]:
         """Validate multiple extractions at once"""
+        # Lowercase the document once and find every candidate term in one pass
+        prepared = prepare(self, document_text)
+        prepared.index_terms(
+            term
+            for field_name, value in extracted_values.items()
+            for term in self._candidate_terms(field_name, value)
+        )
         results = {}
         for field_name, value in extracted_values.items():
             results[field_name] = self.validate_extraction(field_name, value, document_text)
@@ -1,17 +1,95 @@
 """Smart validation that understands different field types"""
 import logging
 import re
-from typing import Dict, List, Optional, Tuple
+import sys
+from typing import Dict, FrozenSet, List, Optional, Tuple
 from .field_categories import (
     VERBATIM_FIELDS, SUMMARY_FIELDS, INFERRED_FIELDS, 
     REGISTRY_ONLY_FIELDS, TERMINOLOGY_VARIANTS
 )
+from .prepared_document import PreparedCache, PreparedDocument, ahocorasick, prepare, scrub
 
 logger = logging.getLogger(__name__)
 
+# Common words that are never treated as key terms
+_STOPWORDS = frozenset({
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "will", "be", "is", "are", "was", "were",
+})
+# Candidate key-term tokens: letters, digits, '/' and '-'
+_KEY_TERM_RE = re.compile(r'\b[A-Za-z0-9/-]+\b')
+_MAX_KEY_TERMS = 10
+# Treat ';' and ',' alike when splitting intervention lists
+_SEP_TRANS = str.maketrans(";", ",")
+# Common medical outcome terms, matched in a single pass
+_MEDICAL_TERM_RE = re.compile(
+    r'\b[A-Z]{2,}\b'                    # Acronyms like ORR, PFS, OS
+    r'|\b\w+(?:emia|osis|itis)\b'        # Medical conditions
+    r'|\b(?:response|survival|progression|toxicity|efficacy)\b',
+    re.IGNORECASE
+)
+
+
+def _build_variant_automaton():
+    """One automaton over every terminology variant, mapping each to its fields"""
+    if ahocorasick is None:
+        return None
+    fields_by_variant: Dict[str, List[str]] = {}
+    for field_name, variants in TERMINOLOGY_VARIANTS.items():
+        for variant in variants:
+            fields_by_variant.setdefault(variant, []).append(field_name)
+    automaton = ahocorasick.Automaton()
+    for variant, fields in fields_by_variant.items():
+        automaton.add_word(variant, tuple(fields))
+    automaton.make_automaton()
+    return automaton
+
+
+_VARIANT_AUTOMATON = _build_variant_automaton()
+
+
+def _variant_fields(prepared: PreparedDocument) -> FrozenSet[str]:
+    """Fields whose terminology variants occur in the document, computed once per document"""
+    key = ("variant_fields",)
+    memo = prepared.memo
+    if key not in memo:
+        doc_lower = prepared.lower
+        if _VARIANT_AUTOMATON is not None:
+            present = set()
+            for _, fields in _VARIANT_AUTOMATON.iter(doc_lower):
+                present.update(fields)
+            memo[key] = frozenset(present)
+        else:
+            memo[key] = frozenset(
+                field_name for field_name, variants in TERMINOLOGY_VARIANTS.items()
+                if any(variant in doc_lower for variant in variants)
+            )
+    return memo[key]
+
 class SmartValidator:
     """Validator that understands different types of extractions"""
     
+    def __init__(self):
+        self._prepared = PreparedCache()
+        # Field name -> (validator, terms the validator looks up), replacing a chain of
+        # category membership tests. Higher-priority categories are added last so they
+        # win, as in the old if/elif order.
+        self._dispatch = {}
+        for fields, handlers in (
+            (INFERRED_FIELDS, (self._validate_inferred, self._no_terms)),
+            (SUMMARY_FIELDS, (self._validate_summary, self._summary_terms)),
+            (VERBATIM_FIELDS, (self._validate_verbatim, self._verbatim_terms)),
+            (REGISTRY_ONLY_FIELDS, (self._validate_registry_only, self._no_terms)),
+        ):
+            for field in fields:
+                self._dispatch[sys.intern(field)] = handlers
+        # Uncategorized fields default to smart validation
+        self._default_handlers = (self._validate_smart, self._smart_terms)
+    
+    def clear_cache(self) -> None:
+        """Drop the cached document views and memoized results"""
+        self._prepared = PreparedCache()
+    
     def validate_extraction(self, field_name: str, extracted_value: Optional[str], 
                           document_text: str, llm_response: Optional[str] = None) -> Tuple[bool, Optional[str]]:
         """
@@ -29,33 +107,35 @@ class SmartValidator:
         if not extracted_value or extracted_value.upper() in ["NOT_FOUND", "NONE", "N/A"]:
             return True, None
         
-        # Registry-only fields shouldn't be extracted from protocols
-        if field_name in REGISTRY_ONLY_FIELDS:
-            logger.debug(f"{field_name} is a registry-only field, not expected in protocols")
-            return True, None  # Allow NOT_FOUND for these
-        
-        # Verbatim fields must exist in document
-        if field_name in VERBATIM_FIELDS:
-            return self._validate_verbatim(field_name, extracted_value, document_text)
+        # Interned names let the dict lookups below compare by identity
+        field_name = sys.intern(field_name)
         
-        # Summary fields don't need exact matches
-        elif field_name in SUMMARY_FIELDS:
-            return self._validate_summary(field_name, extracted_value, document_text)
-        
-        # Inferred fields need loose validation
-        elif field_name in INFERRED_FIELDS:
-            return self._validate_inferred(field_name, extracted_value, document_text)
-        
-        # Default to smart validation
-        else:
-            return self._validate_smart(field_name, extracted_value, document_text)
+        # Reuse the result when the same value was already validated against this document
+        memo = prepare(self, document_text).memo
+        key = ("validate", field_name, extracted_value)
+        if key not in memo:
+            memo[key] = self._validate_value(field_name, extracted_value, document_text)
+        return memo[key]
+    
+    def _validate_value(self, field_name: str, extracted_value: str,
+                        document_text: str) -> Tuple[bool, Optional[str]]:
+        """Validate a non-empty value by field type (uncached)"""
+        handler, _ = self._dispatch.get(field_name, self._default_handlers)
+        return handler(field_name, extracted_value, document_text)
+    
+    def _validate_registry_only(self, field_name: str, value: str, document: str) -> Tuple[bool, Optional[str]]:
+        """Registry-only fields shouldn't be extracted from protocols"""
+        logger.debug(f"{field_name} is a registry-only field, not expected in protocols")
+        return True, None  # Allow NOT_FOUND for these
     
     def _validate_verbatim(self, field_name: str, value: str, document: str) -> Tuple[bool, Optional[str]]:
         """Validate fields that should exist verbatim"""
+        prepared = prepare(self, document)
+        
         # For multi-value fields, check each part
         if ";" in value:
             parts = [p.strip() for p in value.split(";")]
-            found = sum(1 for p in parts if p and (p in document or p.lower() in document.lower()))
+            found = sum(1 for p in parts if p and (p in document or prepared.contains(p.lower())))
             if found == 0:
                 return False, f"None of the values found in document"
             elif found < len(parts):
@@ -63,26 +143,40 @@ class SmartValidator:
             return True, None
         
         # Single value must exist
-        if value in document or value.lower() in document.lower():
+        if value in document or prepared.contains(value.lower()):
             return True, None
         
         # Check without common formatting
-        clean_value = re.sub(r'[^\w\s]', ' ', value).strip()
-        clean_doc = re.sub(r'[^\w\s]', ' ', document)
-        if clean_value.lower() in clean_doc.lower():
+        clean_value = scrub(value).strip()
+        if clean_value.lower() in prepared.scrubbed_lower:
             return True, None
             
         return False, f"Value '{value}' not found in document"
     
     def _validate_summary(self, field_name: str, value: str, document: str) -> Tuple[bool, Optional[str]]:
         """Validate summary/interpretation fields"""
+        prepared = prepare(self, document)
+        doc_lower = prepared.lower
+        
         # For summaries, just check that key terms exist
         if field_name == "brief_summary":
             # Extract key medical terms from the summary
             key_terms = self._extract_key_terms(value)
-            found_terms = sum(1 for term in key_terms if term.lower() in document.lower())
+            # Valid once at least 30% of terms are found; stop scanning as soon
+            # as the outcome is decided either way
+            threshold = len(key_terms) * 0.3
+            found_terms = 0
+            remaining = len(key_terms)
+            for term in key_terms:
+                if found_terms >= threshold:
+                    break
+                if found_terms + remaining < threshold:
+                    break
+                remaining -= 1
+                if prepared.contains(term.lower()):
+                    found_terms += 1
             
-            if found_terms < len(key_terms) * 0.3:  # Less than 30% of terms found
+            if found_terms < threshold:  # Less than 30% of terms found
                 return False, f"Summary contains terms not found in document"
             return True, None
         
@@ -90,7 +184,8 @@ class SmartValidator:
             # Check for design-related terms
             design_terms = ["multicenter", "open-label", "randomized", "controlled", 
                           "phase", "trial", "study", "cohort", "arm"]
-            found_any = any(term in value.lower() and term in document.lower() 
+            value_lower = value.lower()
+            found_any = any(term in value_lower and term in doc_lower 
                           for term in design_terms)
             if not found_any:
                 return False, "Study design terms not found in document"
@@ -102,8 +197,7 @@ class SmartValidator:
             if not outcome_terms:
                 return True, None  # Can't validate without terms
             
-            found = sum(1 for term in outcome_terms if term.lower() in document.lower())
-            if found == 0:
+            if not any(prepared.contains(term.lower()) for term in outcome_terms):
                 return False, "No outcome terms found in document"
             return True, None
         
@@ -116,6 +210,8 @@ class SmartValidator:
     
     def _validate_inferred(self, field_name: str, value: str, document: str) -> Tuple[bool, Optional[str]]:
         """Validate inferred fields with loose matching"""
+        doc_lower = prepare(self, document).lower
+        
         if field_name == "study_status":
             # Status might be inferred from protocol version, dates, etc.
             status_terms = ["ongoing", "active", "recruiting", "completed", "terminated"]
@@ -124,23 +220,23 @@ class SmartValidator:
                 
         elif field_name == "study_type":
             # Type might be inferred from design
-            if "phase" in value.lower() and "phase" in document.lower():
+            if "phase" in value.lower() and "phase" in doc_lower:
                 return True, None
                 
         elif field_name in ["sex", "age"]:
             # These come from eligibility criteria
-            if "eligibility" in document.lower() or "inclusion" in document.lower():
+            if "eligibility" in doc_lower or "inclusion" in doc_lower:
                 return True, None
                 
         return True, None  # Be permissive with inferred fields
     
     def _validate_smart(self, field_name: str, value: str, document: str) -> Tuple[bool, Optional[str]]:
         """Smart validation for uncategorized fields"""
+        prepared = prepare(self, document)
+        
         # Check if we have terminology variants
         if field_name in TERMINOLOGY_VARIANTS:
-            variants = TERMINOLOGY_VARIANTS[field_name]
-            doc_lower = document.lower()
-            if any(variant in doc_lower for variant in variants):
+            if field_name in _variant_fields(prepared):
                 return True, None  # Document discusses this concept
         
         # For unknown fields, be permissive but check for obvious issues
@@ -150,85 +246,100 @@ class SmartValidator:
         # Check if at least some key terms exist
         terms = self._extract_key_terms(value)
         if terms:
-            found = sum(1 for term in terms if term.lower() in document.lower())
-            if found == 0:
+            if not any(prepared.contains(term.lower()) for term in terms):
                 return False, "No relevant terms found in document"
         
         return True, None
     
     def _validate_interventions(self, value: str, document: str) -> Tuple[bool, Optional[str]]:
         """Special validation for interventions field"""
+        prepared = prepare(self, document)
+        
+        # Check each intervention
+        if not any(prepared.contains(name.lower()) for name in self._intervention_names(value)):
+            return False, "No interventions found in document"
+        
+        return True, None
+    
+    def _intervention_names(self, value: str) -> List[str]:
+        """Split an interventions value into the names to look up in the document"""
         # Remove common prefixes
         clean_value = re.sub(r'(Drug|Device|Procedure|Behavioral|Treatment):\s*', '', value)
         
         # Split into parts
-        parts = re.split(r'[;,]\s*', clean_value)
+        parts = [part.strip() for part in clean_value.translate(_SEP_TRANS).split(",") if part.strip()]
         
-        # Check each intervention
-        found = 0
+        names = []
         for part in parts:
-            part = part.strip()
-            if not part:
-                continue
-                
             # Extract just the drug/intervention name
             name_match = re.match(r'^([A-Za-z0-9\-]+)', part)
-            if name_match:
-                name = name_match.group(1)
-                if name.lower() in document.lower():
-                    found += 1
-            elif part.lower() in document.lower():
-                found += 1
-        
-        if found == 0:
-            return False, "No interventions found in document"
+            names.append(name_match.group(1) if name_match else part)
         
-        return True, None
+        return names
     
     def _extract_key_terms(self, text: str) -> List[str]:
-        """Extract key medical/scientific terms from text"""
-        # Remove common words and extract meaningful terms
-        stopwords = {"the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-                    "of", "with", "by", "from", "will", "be", "is", "are", "was", "were"}
-        
-        # Extract words that are likely medical terms
-        words = re.findall(r'\b[A-Za-z0-9/-]+\b', text)
+        """Extract key medical/scientific terms from text (at most the first 10)"""
         terms = []
         
-        for word in words:
-            if len(word) > 3 and word.lower() not in stopwords:
-                # Keep medical-looking terms
-                if (word[0].isupper() or  # Capitalized
-                    any(c.isdigit() for c in word) or  # Contains numbers
-                    '/' in word or '-' in word):  # Contains special chars
+        # Scan lazily so long summaries stop as soon as enough terms are found
+        for match in _KEY_TERM_RE.finditer(text):
+            word = match.group()
+            if len(word) > 3 and word.lower() not in _STOPWORDS:
+                # Keep medical-looking terms: capitalized, or containing a digit,
+                # '/' or '-' (the only non-letters a token can hold)
+                if word[0].isupper() or not word.isalpha():
                     terms.append(word)
+                    if len(terms) == _MAX_KEY_TERMS:
+                        break
         
-        return terms[:10]  # Limit to 10 most important terms
+        return terms
     
     def _extract_medical_terms(self, text: str) -> List[str]:
         """Extract medical terms from outcome measures"""
-        # Common medical outcome terms
-        medical_patterns = [
-            r'\b[A-Z]{2,}\b',  # Acronyms like ORR, PFS, OS
-            r'\b\w+emia\b',    # Medical conditions
-            r'\b\w+osis\b',    
-            r'\b\w+itis\b',
-            r'\bresponse\b',
-            r'\bsurvival\b',
-            r'\bprogression\b',
-            r'\btoxicity\b',
-            r'\befficacy\b',
-        ]
-        
-        terms = []
-        for pattern in medical_patterns:
-            terms.extend(re.findall(pattern, text, re.IGNORECASE))
+        return list({match.group() for match in _MEDICAL_TERM_RE.finditer(text)})  # Unique terms
+    
+    def _no_terms(self, field_name: str, value: str) -> List[str]:
+        """Registry-only and inferred validation never looks terms up"""
+        return []
+    
+    def _verbatim_terms(self, field_name: str, value: str) -> List[str]:
+        """Terms _validate_verbatim looks up: each ';'-separated part, or the whole value"""
+        return [p.strip() for p in value.split(";")] if ";" in value else [value]
+    
+    def _summary_terms(self, field_name: str, value: str) -> List[str]:
+        """Terms _validate_summary looks up for the fields it checks against the document"""
+        if field_name == "brief_summary":
+            return self._extract_key_terms(value)
+        elif field_name in ["primary_outcome_measures", "secondary_outcome_measures"]:
+            return self._extract_medical_terms(value)
+        elif field_name == "interventions":
+            return self._intervention_names(value)
+        return []
+    
+    def _smart_terms(self, field_name: str, value: str) -> List[str]:
+        """Terms _validate_smart looks up; overlong values are rejected before any lookup"""
+        if len(value) > 1000:
+            return []
+        return self._extract_key_terms(value)
+    
+    def _candidate_terms(self, field_name: str, value: Optional[str]) -> List[str]:
+        """Lowercased terms that validate_extraction will look up for this value"""
+        if not value or value.upper() in ["NOT_FOUND", "NONE", "N/A"]:
+            return []
         
-        return list(set(terms))  # Unique terms
+        _, terms_for = self._dispatch.get(sys.intern(field_name), self._default_handlers)
+        return [term.lower() for term in terms_for(field_name, value)]
     
     def batch_validate(self, extracted_values: Dict[str, Optional[str]], 
                       document_text: str) -> Dict[str, Tuple[bool, Optional[str]]]:
         """Validate multiple extractions at once"""
+        # Lowercase the document once and find every candidate term in one pass
+        prepared = prepare(self, document_text)
+        prepared.index_terms(
+            term
+            for field_name, value in extracted_values.items()
+            for term in self._candidate_terms(field_name, value)
+        )
         results = {}
         for field_name, value in extracted_values.items():
             results[field_name] = self.validate_extraction(field_name, value, document_text)
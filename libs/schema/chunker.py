@@ -1,7 +1,12 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from functools import cached_property
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Tuple
 
 class Chunk(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     chunk_id: str
     text: str
     start_page: Optional[int] = None
@@ -9,9 +14,80 @@ class Chunk(BaseModel):
     token_count: int
 
 class ChunkerResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     chunks: List[Chunk]
 
     # summary fields
     num_chunks: int
     total_tokens: int
     embedding_model: Optional[str] = None
+
+    @cached_property
+    def arrays(self) -> "ChunkerResultArrays":
+        """Column-wise view of `chunks`, built on first use (the model is frozen)"""
+        return ChunkerResultArrays.from_chunks(self.chunks)
+
+# Page value stored in the page arrays when a chunk has no known page
+NO_PAGE = -1
+
+class ChunkerResultArrays(BaseModel):
+    """Column-wise (struct-of-arrays) view of a chunk list for batch operations"""
+    model_config = ConfigDict(frozen=True, extra="forbid", arbitrary_types_allowed=True)
+
+    chunk_ids: List[str]
+    texts: List[str]           # pass straight to batch APIs (e.g. embeddings)
+    start_pages: np.ndarray    # int32, NO_PAGE where unknown
+    end_pages: np.ndarray      # int32, NO_PAGE where unknown
+    token_counts: np.ndarray   # int32
+
+    @classmethod
+    def from_chunks(cls, chunks: List[Chunk]) -> "ChunkerResultArrays":
+        n = len(chunks)
+        return cls(
+            chunk_ids=[c.chunk_id for c in chunks],
+            texts=[c.text for c in chunks],
+            start_pages=np.fromiter(
+                (NO_PAGE if c.start_page is None else c.start_page for c in chunks),
+                dtype=np.int32, count=n),
+            end_pages=np.fromiter(
+                (NO_PAGE if c.end_page is None else c.end_page for c in chunks),
+                dtype=np.int32, count=n),
+            token_counts=np.fromiter((c.token_count for c in chunks), dtype=np.int32, count=n),
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        return int(self.token_counts.sum())
+
+    def page_span(self) -> Optional[Tuple[int, int]]:
+        """(first, last) known page across all chunks, or None if no page is known"""
+        starts = self.start_pages[self.start_pages != NO_PAGE]
+        ends = self.end_pages[self.end_pages != NO_PAGE]
+        if not starts.size or not ends.size:
+            return None
+        return int(starts.min()), int(ends.max())
+
+    def indices_on_page(self, page: int) -> np.ndarray:
+        """Indices of the chunks whose page range covers `page`"""
+        mask = (self.start_pages != NO_PAGE) & (self.start_pages <= page) & (self.end_pages >= page)
+        return np.flatnonzero(mask)
+
+    @property
+    def chunks(self) -> List[Chunk]:
+        """Rebuild Chunk objects for code that still needs them"""
+        def _page(p: int) -> Optional[int]:
+            return None if p == NO_PAGE else p
+
+        return [
+            Chunk(
+                chunk_id=chunk_id,
+                text=text,
+                start_page=_page(int(start)),
+                end_page=_page(int(end)),
+                token_count=int(tokens),
+            )
+            for chunk_id, text, start, end, tokens in zip(
+                self.chunk_ids, self.texts, self.start_pages, self.end_pages, self.token_counts
+            )
+        ]
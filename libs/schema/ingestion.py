@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Dict, Optional
 
 class IngestionResult(BaseModel):
+    model_config = ConfigDict(frozen=True, extra="forbid")
+
     text: str
     page_map: List[Dict] = Field(default_factory=list)
     engine: str
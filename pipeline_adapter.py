@@ -2,22 +2,68 @@
 Pipeline adapter for integrating extraction pipelines with Streamlit UI
 """
 import os
+import re
 import json
+import asyncio
 import logging
+import queue
+import shelve
+import threading
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Callable
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Any, Callable
 from datetime import datetime
-import tempfile
 import subprocess
-from dataclasses import dataclass, field
-import csv
+from dataclasses import dataclass, field, replace
 
-from agents.orchestrator.main import extract_info as extract_info_legacy
-from incremental_extractor.extractor import IncrementalExtractor
-from unified_extractor_enhanced import EnhancedUnifiedExtractor
+# The pipelines pull in docling, the OpenAI SDK and friends; they are imported
+# on first use so the UI starts without paying for a pipeline it may not run
+if TYPE_CHECKING:
+    from incremental_extractor.extractor import IncrementalExtractor
+    from unified_extractor_enhanced import EnhancedUnifiedExtractor
 
 logger = logging.getLogger(__name__)
 
+# Documents extracted at once; extraction is bound by OpenAI round-trips, not CPU
+MAX_CONCURRENT_DOCS = 8
+
+# Finished jobs kept in the job store; older ones are pruned as new ones are saved
+MAX_STORED_JOBS = 50
+
+# Job store entry listing stored job ids, oldest first
+_JOB_ORDER_KEY = '__job_order__'
+
+# Common patterns: NCT12345678_Protocol.pdf, NCT12345678_SAP_v1.pdf
+_NCT_RE = re.compile(r'(NCT\d{8})')
+
+# Document type -> filename substrings, checked in priority order
+# ('_prot_' and '_protocol' variants are covered by their shorter forms)
+_DOC_TYPE_MARKERS = (
+    ('Protocol', ('_prot_', 'protocol')),
+    ('SAP', ('sap',)),
+    ('ICF', ('icf',)),
+)
+
+
+@lru_cache(maxsize=256)
+def _doc_type_for(filename: str) -> str:
+    """Document type for a filename; cached because the UI asks again on every rerun"""
+    filename_lower = filename.lower()
+    for doc_type, markers in _DOC_TYPE_MARKERS:
+        if any(marker in filename_lower for marker in markers):
+            return doc_type
+    return 'Unknown'
+
+# Extracted field name -> CT.gov CSV column; unmapped fields use their own name
+CTGOV_FIELD_MAPPING = {
+    'nct_number': 'NCT Number',
+    'study_title': 'Study Title',
+    'conditions': 'Conditions',
+    'interventions': 'Interventions',
+    'sponsor': 'Sponsor',
+    # Add more mappings as needed
+}
+
 @dataclass
 class ExtractionJob:
     """Represents an extraction job"""
@@ -33,6 +79,27 @@ class ExtractionJob:
     start_time: Optional[datetime] = None
     end_time: Optional[datetime] = None
 
+@dataclass
+class JobSummary:
+    """What the UI keeps per job between reruns; no PDF bytes or results"""
+    job_id: str
+    nct_number: str
+    pipeline_type: str
+    status: str
+    pdf_names: List[str]
+    error: Optional[str] = None
+    
+    @classmethod
+    def from_job(cls, job: ExtractionJob) -> "JobSummary":
+        return cls(
+            job_id=job.job_id,
+            nct_number=job.nct_number,
+            pipeline_type=job.pipeline_type,
+            status=job.status,
+            pdf_names=[filename for filename, _, _ in job.pdf_files],
+            error=job.error
+        )
+
 class PipelineAdapter:
     """Unified interface for extraction pipelines"""
     
@@ -43,186 +110,293 @@ class PipelineAdapter:
         # Check for API key
         self.api_key = os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY")
         
+        # Extractors are built on first use and then shared by every job, so
+        # their setup and OpenAI connection pools are paid for once
+        self._enhanced: Optional["EnhancedUnifiedExtractor"] = None
+        self._incremental: Optional["IncrementalExtractor"] = None
+        self._legacy_extract: Optional[Callable[[bytes], Dict[str, Any]]] = None
+        
+        # Finished jobs live on disk rather than in every session's memory;
+        # shelve allows one writer at a time, and sessions share this adapter
+        self._job_store = str(self.results_dir / "jobs")
+        self._job_store_lock = threading.Lock()
+    
+    @property
+    def enhanced_extractor(self) -> "EnhancedUnifiedExtractor":
+        """Shared merger/comparator for the enhanced pipeline"""
+        if self._enhanced is None:
+            from unified_extractor_enhanced import EnhancedUnifiedExtractor
+            self._enhanced = EnhancedUnifiedExtractor()
+        return self._enhanced
+    
+    @property
+    def incremental_extractor(self) -> "IncrementalExtractor":
+        """Shared per-document extractor for the enhanced pipeline (needs an API key)"""
+        if self._incremental is None:
+            from incremental_extractor.extractor import IncrementalExtractor
+            self._incremental = IncrementalExtractor(api_key=self.api_key)
+        return self._incremental
+    
+    @property
+    def legacy_extract(self) -> Callable[[bytes], Dict[str, Any]]:
+        """Legacy single-PDF extraction function"""
+        if self._legacy_extract is None:
+            from agents.orchestrator.main import extract_info
+            self._legacy_extract = extract_info
+        return self._legacy_extract
+    
+    def save_job(self, job: ExtractionJob) -> JobSummary:
+        """
+        Store a finished job and return its summary; PDF bytes are not kept.
+        
+        Only the MAX_STORED_JOBS most recently saved jobs are kept, so the store
+        does not grow across sessions.
+        """
+        stored = replace(job, pdf_files=[(filename, b'', doc_type) for filename, _, doc_type in job.pdf_files])
+        with self._job_store_lock, shelve.open(self._job_store) as store:
+            store[job.job_id] = stored
+            
+            order = [job_id for job_id in store.get(_JOB_ORDER_KEY, []) if job_id != job.job_id]
+            order.append(job.job_id)
+            for job_id in order[:-MAX_STORED_JOBS]:
+                if job_id in store:
+                    del store[job_id]
+            store[_JOB_ORDER_KEY] = order[-MAX_STORED_JOBS:]
+        return JobSummary.from_job(job)
+    
+    def load_job(self, job_id: str) -> Optional[ExtractionJob]:
+        """Load a job stored by save_job, or None if it is unknown"""
+        with self._job_store_lock, shelve.open(self._job_store) as store:
+            return store.get(job_id)
+    
     def extract_nct_number(self, filename: str) -> Optional[str]:
         """Extract NCT number from filename"""
-        # Common patterns: NCT12345678_Protocol.pdf, NCT12345678_SAP_v1.pdf
-        import re
-        match = re.search(r'(NCT\d{8})', filename)
+        match = _NCT_RE.search(filename)
         return match.group(1) if match else None
     
     def determine_doc_type(self, filename: str) -> str:
         """Determine document type from filename"""
-        filename_lower = filename.lower()
-        if '_prot_' in filename_lower or '_protocol' in filename_lower or 'protocol' in filename_lower:
-            return 'Protocol'
-        elif '_sap_' in filename_lower or 'sap' in filename_lower:
-            return 'SAP'
-        elif '_icf_' in filename_lower or 'icf' in filename_lower:
-            return 'ICF'
-        else:
-            return 'Unknown'
+        return _doc_type_for(filename)
     
     def run_legacy_extraction(self, job: ExtractionJob, progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
         """Run legacy extraction pipeline"""
+        return asyncio.run(self.run_legacy_extraction_async(job, progress_callback))
+    
+    async def run_legacy_extraction_async(self, job: ExtractionJob,
+                                          progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """Run legacy extraction pipeline, extracting up to MAX_CONCURRENT_DOCS files at a time"""
         results = {}
+        if not job.pdf_files:
+            return results
         
-        for idx, (filename, pdf_bytes, doc_type) in enumerate(job.pdf_files):
-            if progress_callback:
-                progress = (idx / len(job.pdf_files)) * 100
-                progress_callback(progress, f"Processing {filename} with legacy pipeline...")
+        total_files = len(job.pdf_files)
+        if progress_callback:
+            progress_callback(0, f"Processing {total_files} file(s) with legacy pipeline...")
+        
+        # Resolve the import here so a missing dependency fails the job, not each file
+        extract_info = self.legacy_extract
+        semaphore = asyncio.Semaphore(min(MAX_CONCURRENT_DOCS, total_files))
+        # Every file in the job shares one extraction timestamp
+        extraction_time = datetime.now().isoformat()
+        
+        async def _extract_one(filename: str, pdf_bytes: bytes, doc_type: str) -> Tuple[str, Dict[str, Any]]:
+            async with semaphore:
+                # Legacy pipeline expects single PDF; files are independent and I/O bound
+                result = await asyncio.to_thread(
+                    self._legacy_result, extract_info, job, filename, pdf_bytes, doc_type, extraction_time
+                )
+            return filename, result
+        
+        pending = [_extract_one(*pdf_file) for pdf_file in job.pdf_files]
+        for done, next_result in enumerate(asyncio.as_completed(pending), start=1):
+            filename, result = await next_result
+            results[filename] = result
             
-            try:
-                # Legacy pipeline expects single PDF
-                extraction = extract_info_legacy(pdf_bytes)
-                
-                # Add metadata
-                extraction['_metadata'] = {
-                    'filename': filename,
-                    'doc_type': doc_type,
-                    'nct_number': job.nct_number,
-                    'extraction_time': datetime.now().isoformat()
-                }
-                
-                results[filename] = {
-                    'status': 'success',
-                    'extraction': extraction
-                }
-                
-            except Exception as e:
-                logger.error(f"Legacy extraction failed for {filename}: {e}")
-                results[filename] = {
-                    'status': 'failed',
-                    'error': str(e)
-                }
+            if progress_callback:
+                progress = (done / total_files) * 100
+                progress_callback(progress, f"Processed {filename} with legacy pipeline ({done}/{total_files})")
         
-        return results
+        # Keep upload order regardless of completion order
+        return {filename: results[filename] for filename, _, _ in job.pdf_files}
+    
+    def _legacy_result(self, extract_info: Callable[[bytes], Dict[str, Any]], job: ExtractionJob,
+                       filename: str, pdf_bytes: bytes, doc_type: str,
+                       extraction_time: str) -> Dict[str, Any]:
+        """Run the legacy pipeline on one PDF and wrap it in the per-file result format"""
+        try:
+            extraction = extract_info(pdf_bytes)
+            
+            # Add metadata
+            extraction['_metadata'] = {
+                'filename': filename,
+                'doc_type': doc_type,
+                'nct_number': job.nct_number,
+                'extraction_time': extraction_time
+            }
+            
+            return {
+                'status': 'success',
+                'extraction': extraction
+            }
+            
+        except Exception as e:
+            logger.error(f"Legacy extraction failed for {filename}: {e}")
+            return {
+                'status': 'failed',
+                'error': str(e)
+            }
     
     def run_enhanced_extraction(self, job: ExtractionJob, progress_callback: Optional[Callable] = None) -> Dict[str, Any]:
         """Run enhanced extraction pipeline with CT.gov comparison"""
+        return asyncio.run(self.run_enhanced_extraction_async(job, progress_callback))
+    
+    async def run_enhanced_extraction_async(self, job: ExtractionJob,
+                                            progress_callback: Optional[Callable] = None,
+                                            partial_callback: Optional[Callable] = None) -> Dict[str, Any]:
+        """
+        Run enhanced extraction pipeline with CT.gov comparison on the running event loop.
+        
+        If given, partial_callback receives {'unified_data', 'ctgov_data'} merged from
+        the documents finished so far each time another document completes.
+        """
         if not self.api_key:
             raise ValueError("OpenAI API key not found. Please set OPENAI_API_KEY environment variable.")
         
-        # Save PDFs to temp directory
-        temp_dir = Path(tempfile.mkdtemp())
-        pdf_paths = []
+        # PDFs are handed to the extractor in memory; nothing is staged on disk
+        if progress_callback:
+            progress_callback(10, "Initializing enhanced extractor...")
         
-        try:
-            # Save PDFs temporarily
-            for filename, pdf_bytes, doc_type in job.pdf_files:
-                pdf_path = temp_dir / filename
-                pdf_path.write_bytes(pdf_bytes)
-                pdf_paths.append((str(pdf_path), doc_type))
+        extractor = self.enhanced_extractor
+        
+        # Look for CT.gov CSV in examples directory (one lookup serves the whole job)
+        ctgov_csv = next(Path("examples").glob(f"{job.nct_number}_ct_*.csv"), None)
+        ctgov_csv_path = str(ctgov_csv) if ctgov_csv else None
+        
+        # Load CT.gov data for comparison if available
+        from incremental_extractor.ctgov_data import load_ctgov_row
+        ctgov_data = load_ctgov_row(ctgov_csv) if ctgov_csv else {}
+        
+        document_callback = None
+        if partial_callback:
+            def document_callback(extractions: Dict[str, Dict[str, Any]]) -> None:
+                partial_callback({
+                    'unified_data': extractor.merge_extractions(job.nct_number, extractions),
+                    'ctgov_data': ctgov_data
+                })
+        
+        # Run extraction for all documents concurrently (10-70% of progress)
+        all_extractions = await self._extract_documents(job, ctgov_csv_path, progress_callback, document_callback)
+        
+        if progress_callback:
+            progress_callback(70, "Merging extractions...")
+        
+        # Merge extractions
+        if all_extractions:
+            unified_data = extractor.merge_extractions(job.nct_number, all_extractions)
             
             if progress_callback:
-                progress_callback(10, "PDFs saved, initializing enhanced extractor...")
-            
-            # Initialize enhanced extractor
-            extractor = EnhancedUnifiedExtractor()
-            
-            # Run extraction for each document
-            all_extractions = {}
-            total_docs = len(pdf_paths)
+                progress_callback(85, "Finalizing extraction...")
             
-            for idx, (pdf_path, doc_type) in enumerate(pdf_paths):
-                if progress_callback:
-                    progress = 10 + (idx / total_docs) * 60  # 10-70% for extraction
-                    progress_callback(progress, f"Extracting from {doc_type}...")
-                
-                # Run extraction directly using IncrementalExtractor
-                try:
-                    incremental_extractor = IncrementalExtractor(api_key=self.api_key)
-                    
-                    # Look for CT.gov CSV in examples directory
-                    ctgov_csv_path = None
-                    examples_dir = Path("examples")
-                    if examples_dir.exists():
-                        csv_files = list(examples_dir.glob(f"{job.nct_number}_ct_*.csv"))
-                        if csv_files:
-                            ctgov_csv_path = str(csv_files[0])
-                    
-                    # Extract from PDF using temp path directly
-                    checkpoint = incremental_extractor.extract_from_pdf(
-                        pdf_path=pdf_path,  # Use temp file directly
+            return {
+                'status': 'success',
+                'unified_data': unified_data,
+                'ctgov_data': ctgov_data,
+                'report_path': None  # Not saving to disk
+            }
+        else:
+            return {
+                'status': 'failed',
+                'error': 'No extractions succeeded'
+            }
+    
+    async def _extract_documents(self, job: ExtractionJob, ctgov_csv_path: Optional[str],
+                                 progress_callback: Optional[Callable] = None,
+                                 document_callback: Optional[Callable] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Extract every document in-process, running up to MAX_CONCURRENT_DOCS at a time.
+        
+        document_callback, if given, receives the extractions finished so far
+        (keyed by doc type, in completion order) after each successful document.
+        """
+        # One extractor serves every document; its OpenAI calls run on worker threads
+        incremental_extractor = self.incremental_extractor
+        total_docs = len(job.pdf_files)
+        semaphore = asyncio.Semaphore(min(total_docs, MAX_CONCURRENT_DOCS) or 1)
+        done = 0
+        finished: Dict[str, Dict[str, Any]] = {}
+        
+        async def _extract_one(filename: str, pdf_bytes: bytes, doc_type: str) -> Optional[Dict[str, Any]]:
+            nonlocal done
+            try:
+                async with semaphore:
+                    # Extract straight from the uploaded bytes
+                    checkpoint = await asyncio.to_thread(
+                        incremental_extractor.extract_from_bytes,
+                        pdf_bytes=pdf_bytes,
+                        filename=filename,
                         nct_number=job.nct_number,
                         pdf_type=doc_type,
-                        resume=False,  # Always start fresh
                         compare_immediately=True,
                         ctgov_csv_path=ctgov_csv_path
                     )
-                    
-                    # Convert checkpoint to dict for compatibility
-                    extraction_dict = {
-                        'nct_number': checkpoint.nct_number,
-                        'pdf_type': checkpoint.pdf_type,
-                        'pdf_path': pdf_path,  # Add the missing pdf_path
-                        'fields': {
-                            field_name: {
-                                'value': field.value,
-                                'status': field.status.value,
-                                'extraction_time': field.extraction_time.isoformat() if field.extraction_time else None
-                            }
-                            for field_name, field in checkpoint.fields.items()
-                        },
-                        'completed_fields': checkpoint.completed_fields,
-                        'total_fields': checkpoint.total_fields,
-                        'progress_percentage': checkpoint.progress_percentage
-                    }
-                    
-                    all_extractions[doc_type] = extraction_dict
-                    
-                except Exception as e:
-                    logger.error(f"Extraction failed for {doc_type}: {e}")
-            
-            if progress_callback:
-                progress_callback(70, "Merging extractions...")
-            
-            # Merge extractions
-            if all_extractions:
-                unified_data = extractor.merge_extractions(job.nct_number, all_extractions)
-                
-                # Check for CT.gov data
-                ctgov_csv = None
-                csv_files = list(Path("examples").glob(f"{job.nct_number}_ct_*.csv"))
-                if csv_files:
-                    ctgov_csv = csv_files[0]
                 
-                if progress_callback:
-                    progress_callback(85, "Finalizing extraction...")
+                # Use the in-memory checkpoint directly; nothing round-trips through JSON
+                extraction_dict = checkpoint.to_extraction_dict()
                 
-                # Load CT.gov data for comparison if available
-                ctgov_data = {}
-                if ctgov_csv:
-                    with open(ctgov_csv, 'r', encoding='utf-8') as f:
-                        reader = csv.DictReader(f)
-                        ctgov_data = next(reader, {})
+                if document_callback:
+                    finished[doc_type] = extraction_dict
+                    try:
+                        document_callback(dict(finished))
+                    except Exception as e:
+                        # A failed preview must not discard a good extraction
+                        logger.warning(f"Partial results callback failed for {doc_type}: {e}")
                 
-                return {
-                    'status': 'success',
-                    'unified_data': unified_data,
-                    'ctgov_data': ctgov_data,
-                    'report_path': None  # Not saving to disk
-                }
-            else:
-                return {
-                    'status': 'failed',
-                    'error': 'No extractions succeeded'
-                }
+                return extraction_dict
                 
-        finally:
-            # Cleanup temp directory
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
+            except Exception as e:
+                logger.error(f"Extraction failed for {doc_type}: {e}")
+                return None
+            
+            finally:
+                # Callbacks run on the event loop thread, i.e. the caller's thread
+                done += 1
+                if progress_callback:
+                    progress = 10 + (done / total_docs) * 60
+                    progress_callback(progress, f"Extracted {doc_type} ({done}/{total_docs})")
+        
+        extractions = await asyncio.gather(
+            *[_extract_one(filename, pdf_bytes, doc_type) for filename, pdf_bytes, doc_type in job.pdf_files]
+        )
+        
+        # Keep upload order so a repeated doc type resolves the same way as before
+        all_extractions = {}
+        for (_, _, doc_type), extraction_dict in zip(job.pdf_files, extractions):
+            if extraction_dict is not None:
+                all_extractions[doc_type] = extraction_dict
+        return all_extractions
     
     def process_job(self, job: ExtractionJob, progress_callback: Optional[Callable] = None) -> ExtractionJob:
-        """Process an extraction job"""
+        """Process an extraction job (blocking; async callers use process_job_async)"""
+        return asyncio.run(self.process_job_async(job, progress_callback))
+    
+    async def process_job_async(self, job: ExtractionJob,
+                                progress_callback: Optional[Callable] = None,
+                                partial_callback: Optional[Callable] = None) -> ExtractionJob:
+        """
+        Process an extraction job without blocking the event loop.
+        
+        Extraction work runs on worker threads; progress_callback and
+        partial_callback are always invoked from the event loop's thread.
+        Several jobs may be awaited concurrently on one loop.
+        """
         job.status = 'running'
         job.start_time = datetime.now()
         
         try:
             if job.pipeline_type == 'legacy':
-                job.results = self.run_legacy_extraction(job, progress_callback)
+                job.results = await self.run_legacy_extraction_async(job, progress_callback)
             elif job.pipeline_type == 'enhanced':
-                job.results = self.run_enhanced_extraction(job, progress_callback)
+                job.results = await self.run_enhanced_extraction_async(job, progress_callback, partial_callback)
             else:
                 raise ValueError(f"Unknown pipeline type: {job.pipeline_type}")
             
@@ -240,6 +414,43 @@ class PipelineAdapter:
         job.end_time = datetime.now()
         return job
     
+    def process_job_iter(self, job: ExtractionJob) -> Iterator[Tuple[float, str, Optional[Dict[str, Any]]]]:
+        """
+        Process an extraction job, yielding (progress, message, partial_results) as it runs.
+        
+        The job runs on a worker thread so the caller's thread stays free to render
+        each update. partial_results is the enhanced pipeline's merge of the documents
+        finished so far and None for plain progress updates. The job is updated in place
+        and stored with save_job by the worker, so it is kept even if the caller stops
+        iterating (e.g. a Streamlit rerun) before the job finishes.
+        """
+        updates: queue.Queue = queue.Queue()
+        finished = object()
+        
+        def _progress(progress: float, message: str) -> None:
+            updates.put((progress, message, None))
+        
+        def _partial(partial: Dict[str, Any]) -> None:
+            updates.put((None, None, partial))
+        
+        def _run() -> None:
+            try:
+                asyncio.run(self.process_job_async(job, _progress, _partial))
+                self.save_job(job)
+            finally:
+                updates.put(finished)
+        
+        worker = threading.Thread(target=_run, name=f"job-{job.job_id}", daemon=True)
+        worker.start()
+        
+        progress, message = 0.0, ""
+        for update in iter(updates.get, finished):
+            if update[0] is not None:
+                progress, message = update[0], update[1]
+            yield progress, message, update[2]
+        
+        worker.join()
+    
     def get_comparison_stats(self, unified_data: Dict[str, Any], ctgov_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate comparison statistics"""
         stats = {
@@ -258,28 +469,31 @@ class PipelineAdapter:
         
         # Count matches/mismatches if we have CT.gov data
         if ctgov_data and 'fields' in unified_data:
-            field_mapping = {
-                'nct_number': 'NCT Number',
-                'study_title': 'Study Title',
-                'conditions': 'Conditions',
-                'interventions': 'Interventions',
-                'sponsor': 'Sponsor',
-                # Add more mappings as needed
+            # Normalize the CT.gov values once rather than once per extracted field
+            ctgov_norm = {
+                column: value.lower().strip()
+                for column, value in ctgov_data.items()
+                if isinstance(value, str) and value
             }
             
-            for field_name, field_data in unified_data['fields'].items():
-                if field_data.get('value'):
-                    ctgov_field = field_mapping.get(field_name, field_name)
-                    ctgov_value = ctgov_data.get(ctgov_field, '')
-                    
-                    if ctgov_value:
-                        # Simple comparison - could be enhanced
-                        if str(field_data['value']).lower().strip() == ctgov_value.lower().strip():
-                            stats['matched_fields'] += 1
-                        else:
-                            stats['mismatched_fields'] += 1
-                    else:
-                        stats['unique_extractions'] += 1
+            # Extracted fields with a value, paired with their CT.gov column
+            extracted = [
+                (CTGOV_FIELD_MAPPING.get(field_name, field_name), field_data['value'])
+                for field_name, field_data in unified_data['fields'].items()
+                if field_data.get('value')
+            ]
+            
+            # Only fields CT.gov also has can match; the rest are unique extractions
+            comparable = [(column, value) for column, value in extracted if column in ctgov_norm]
+            # Simple comparison - could be enhanced
+            matched = sum(
+                1 for column, value in comparable
+                if str(value).lower().strip() == ctgov_norm[column]
+            )
+            
+            stats['matched_fields'] += matched
+            stats['mismatched_fields'] += len(comparable) - matched
+            stats['unique_extractions'] += len(extracted) - len(comparable)
             
             total_compared = stats['matched_fields'] + stats['mismatched_fields']
             if total_compared > 0:
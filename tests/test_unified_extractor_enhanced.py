@@ -0,0 +1,50 @@
+"""Retry and failure reporting in EnhancedUnifiedExtractor"""
+import sys
+from pathlib import Path
+
+import openai
+import openai._exceptions
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import unified_extractor_enhanced
+from unified_extractor_enhanced import EnhancedUnifiedExtractor
+
+NCT = "NCT00000001"
+
+
+def _rate_limited(*args, **kwargs):
+    # openai releases differ in which httpx package they build responses from
+    httpx = getattr(openai._exceptions, "httpx", None) or openai._exceptions.httpx2
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    raise openai.RateLimitError(
+        "rate limited", response=httpx.Response(429, request=request), body=None
+    )
+
+
+@pytest.fixture
+def trial_dir(tmp_path, monkeypatch):
+    examples = tmp_path / "examples"
+    examples.mkdir()
+    (examples / f"{NCT}_Prot_000.pdf").write_bytes(b"%PDF-1.4")
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setenv("COMPARATOR_CACHE_DISABLE", "1")
+    monkeypatch.setattr(
+        "incremental_extractor.extractor.extract_text_from_pdf",
+        lambda pdf_path: "A randomized trial of drug X in adults.",
+    )
+    return tmp_path
+
+
+def test_rate_limited_document_is_reported_as_failed(trial_dir, monkeypatch):
+    monkeypatch.setattr(openai.resources.chat.completions.Completions, "create", _rate_limited)
+    sleeps = []
+    monkeypatch.setattr(unified_extractor_enhanced.time, "sleep", sleeps.append)
+
+    extractions, failed_documents = EnhancedUnifiedExtractor().extract_all_documents(NCT)
+
+    assert extractions == {}
+    assert failed_documents == ["Protocol"]
+    assert len(sleeps) == EnhancedUnifiedExtractor.EXTRACTION_RETRIES
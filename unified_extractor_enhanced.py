@@ -2,31 +2,187 @@
 """
 Enhanced unified extraction pipeline with intelligent CT.gov comparison
 """
+import io
 import json
 import os
+import time
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
-import subprocess
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Any
 import csv
-from incremental_extractor.intelligent_comparator import IntelligentComparator
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from incremental_extractor.chunk_mapper import ChunkMapper
+from incremental_extractor.intelligent_comparator import get_comparator
+from incremental_extractor.schema import ExtractionCheckpoint, ExtractionStatus
+
+if TYPE_CHECKING:
+    from incremental_extractor.extractor import IncrementalExtractor
+
+# Errors worth retrying: API hiccups and IO that may succeed on a second try.
+# Anything else (a missing or unreadable PDF, a bug) fails the same way again
+try:
+    import openai
+    _TRANSIENT_API_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+except ImportError:
+    _TRANSIENT_API_ERRORS = ()
+# Upper bound on OpenAI requests in flight across every trial process in main()
+MAX_CONCURRENT_REQUESTS = 64
+
+_PERMANENT_IO_ERRORS = (FileNotFoundError, IsADirectoryError, NotADirectoryError, PermissionError)
+
+class _NothingExtracted(Exception):
+    """
+    A document came back without a single usable field.
+    
+    IncrementalExtractor logs and swallows OpenAI errors per field, so a run
+    whose every request was rate limited or dropped looks like this rather
+    than raising; it is retried like any other transient error.
+    """
+
+def _is_transient(error: Exception) -> bool:
+    """Whether an extraction error may clear up if the extraction is retried"""
+    if isinstance(error, (_NothingExtracted,) + _TRANSIENT_API_ERRORS):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, _PERMANENT_IO_ERRORS)
+
+# orjson is optional; it serializes straight to bytes and is much faster on large files
+try:
+    import orjson
+
+    def _dumps(data: Any) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _dumps(data: Any) -> bytes:
+        return json.dumps(data, indent=2).encode()
+
+# Priority order for different fields
+_FIELD_PRIORITIES = MappingProxyType({
+    # Protocol is best for these
+    "study_title": ("Protocol", "SAP", "ICF"),
+    "conditions": ("Protocol", "SAP", "ICF"),
+    "interventions": ("Protocol", "SAP", "ICF"),
+    "eligibility": ("Protocol", "ICF", "SAP"),
+    "sponsor": ("Protocol", "SAP", "ICF"),
+    
+    # SAP is best for these
+    "primary_outcome_measures": ("SAP", "Protocol", "ICF"),
+    "secondary_outcome_measures": ("SAP", "Protocol", "ICF"),
+    "statistical_methods": ("SAP", "Protocol", "ICF"),
+    "sample_size": ("SAP", "Protocol", "ICF"),
+    
+    # ICF might have unique patient-friendly info
+    "brief_summary": ("ICF", "Protocol", "SAP"),
+    
+    # Default priority
+    "_default": ("Protocol", "SAP", "ICF")
+})
+
+# Extracted field name -> CT.gov CSV column
+_FIELD_MAPPING = MappingProxyType({
+    'nct_number': 'NCT Number',
+    'study_title': 'Study Title',
+    'acronym': 'Acronym',
+    'brief_summary': 'Brief Summary',
+    'study_status': 'Study Status',
+    'conditions': 'Conditions',
+    'interventions': 'Interventions',
+    'primary_outcome_measures': 'Primary Outcome Measures',
+    'secondary_outcome_measures': 'Secondary Outcome Measures',
+    'sponsor': 'Sponsor',
+    'phases': 'Phases',
+    'enrollment': 'Enrollment',
+    'study_type': 'Study Type',
+    'study_design': 'Study Design',
+    'start_date': 'Start Date',
+    'sex': 'Sex',
+    'age': 'Age',
+    'funder_type': 'Funder Type',
+    'other_ids': 'Other IDs',
+    'locations': 'Locations',
+})
+
+def _truncate(value: Any, limit: int = 200) -> str:
+    """Shorten a value for the report, marking the cut with an ellipsis"""
+    text = value if isinstance(value, str) else str(value)
+    return text[:limit] + '...' if len(text) > limit else text
+
+def _nothing_extracted_reason(checkpoint: ExtractionCheckpoint) -> Optional[str]:
+    """Why a checkpoint holds no usable field, or None if it holds one"""
+    # The NCT number alone proves nothing: it is usually taken from the filename
+    if any(
+        extraction.status == ExtractionStatus.COMPLETED
+        for field_name, extraction in checkpoint.fields.items()
+        if field_name != 'nct_number'
+    ):
+        return None
+    errors = [extraction.error_message for extraction in checkpoint.fields.values() if extraction.error_message]
+    return errors[0] if errors else "no fields were extracted"
+
+class ExtractionFailed(Exception):
+    """A trial document could not be extracted, even after retrying"""
 
 class EnhancedUnifiedExtractor:
     """Extract unified data with intelligent comparison"""
     
+    # Extra attempts per document after a failure, with exponential backoff
+    EXTRACTION_RETRIES = 2
+    
+    # Documents of one trial extracted at once; each maps chunks on up to
+    # ChunkMapper.MAX_CONCURRENT_REQUESTS threads of its own
+    MAX_CONCURRENT_DOCUMENTS = 4
+    
     def __init__(self):
-        self.checkpoint_dir = Path("checkpoints")
         self.results_dir = Path("results/extractions")
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
         # Initialize intelligent comparator
         api_key = os.getenv("API_KEY") or os.getenv("OPENAI_API_KEY")
-        self.comparator = IntelligentComparator(api_key) if api_key else None
+        self.comparator = get_comparator(api_key) if api_key else None
         
+        # Built on first use and shared by every document of every trial
+        self._incremental: Optional["IncrementalExtractor"] = None
+        
+        # One listing of the examples directory serves every lookup until the
+        # directory changes (its mtime moves whenever a file is added or removed)
+        self.examples_dir = Path("examples")
+        self._examples_listing: Optional[Tuple[int, List[str]]] = None
+        
+    @property
+    def incremental_extractor(self) -> "IncrementalExtractor":
+        """Shared per-document extractor (needs an API key)"""
+        if self._incremental is None:
+            from incremental_extractor.extractor import IncrementalExtractor
+            self._incremental = IncrementalExtractor()
+        return self._incremental
+        
+    def _examples_entries(self) -> List[str]:
+        """Names in the examples directory, re-listed only when it changes"""
+        try:
+            mtime = os.stat(self.examples_dir).st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        listing = self._examples_listing
+        if listing is None or listing[0] != mtime:
+            with os.scandir(self.examples_dir) as entries:
+                listing = (mtime, [entry.name for entry in entries])
+            self._examples_listing = listing
+        return listing[1]
+    
+    def _find_ctgov_csv(self, nct_number: str) -> Optional[str]:
+        """Path of the CT.gov CSV export for a trial, if there is one"""
+        prefix = f"{nct_number}_ct_"
+        for name in self._examples_entries():
+            if name.startswith(prefix) and name.endswith(".csv"):
+                return str(self.examples_dir / name)
+        return None
+    
     def get_trial_documents(self, nct_number: str) -> List[Tuple[str, str]]:
         """Find all documents for a given NCT number"""
         documents = []
-        examples_dir = Path("examples")
+        names = self._examples_entries()
         
         # Check for different document types
         doc_types = {
@@ -36,125 +192,164 @@ class EnhancedUnifiedExtractor:
         }
         
         for pattern, doc_type in doc_types.items():
-            pdfs = list(examples_dir.glob(f"{nct_number}{pattern}*.pdf"))
-            for pdf in pdfs:
-                documents.append((str(pdf), doc_type))
+            prefix = f"{nct_number}{pattern}"
+            for name in names:
+                if name.startswith(prefix) and name.endswith(".pdf"):
+                    documents.append((str(self.examples_dir / name), doc_type))
                 
         return documents
     
-    def extract_all_documents(self, nct_number: str) -> Dict[str, Any]:
-        """Extract data from all documents for a trial"""
+    def extract_all_documents(self, nct_number: str) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Extract data from all documents for a trial.
+        
+        Returns:
+            Tuple of (extractions by document type, document types that failed)
+        """
         documents = self.get_trial_documents(nct_number)
         
         if not documents:
             print(f"No documents found for {nct_number}")
-            return {}
+            return {}, []
             
         print(f"\nProcessing {nct_number} with {len(documents)} documents:")
         for doc_path, doc_type in documents:
             print(f"  - {doc_type}: {doc_path}")
         
-        # Extract from each document
-        all_extractions = {}
-        for doc_path, doc_type in documents:
+        # One extraction per document type; when a type has several PDFs the
+        # last one wins. Types are independent, so up to MAX_CONCURRENT_DOCUMENTS
+        # of them run at once
+        by_type = dict((doc_type, doc_path) for doc_path, doc_type in documents)
+        doc_types = list(by_type)
+        for doc_type in doc_types:
             print(f"\nExtracting from {doc_type}...")
-            
-            # Run extraction
-            cmd = ["python3", "run_incremental_extraction.py", "--nct", nct_number, "--pdf-type", doc_type]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode == 0:
-                # Load the checkpoint
-                checkpoint_file = self.checkpoint_dir / f"{nct_number}_{doc_type.lower()}_checkpoint.json"
-                if checkpoint_file.exists():
-                    with open(checkpoint_file, 'r') as f:
-                        checkpoint = json.load(f)
-                        all_extractions[doc_type] = checkpoint
+        
+        ctgov_csv = self._find_ctgov_csv(nct_number)
+        
+        # Build the shared extractor before the workers race to create it
+        try:
+            self.incremental_extractor
+        except Exception as e:
+            print(f"Cannot start extraction for {nct_number}: {e}")
+            return {}, doc_types
+        
+        with ThreadPoolExecutor(max_workers=min(len(doc_types), self.MAX_CONCURRENT_DOCUMENTS)) as executor:
+            futures = [
+                executor.submit(self._extract_document, nct_number, by_type[doc_type], doc_type, ctgov_csv)
+                for doc_type in doc_types
+            ]
+        
+        # Keep document order regardless of which run finished first; failed
+        # types are reported separately so the merge can tell them apart from
+        # documents that simply lacked a field
+        all_extractions = {}
+        failed_documents = []
+        for doc_type, future in zip(doc_types, futures):
+            try:
+                all_extractions[doc_type] = future.result()
+            except ExtractionFailed as e:
+                print(e)
+                failed_documents.append(doc_type)
                         
-        return all_extractions
+        return all_extractions, failed_documents
     
-    def merge_extractions(self, nct_number: str, all_extractions: Dict[str, Any]) -> Dict[str, Any]:
-        """Merge extractions from multiple documents with priority rules and traceability"""
+    def _extract_document(self, nct_number: str, pdf_path: str, doc_type: str,
+                          ctgov_csv_path: Optional[str]) -> Dict[str, Any]:
+        """
+        Extract one document in-process and return its checkpoint as a dict.
+        
+        Transient API and IO errors, and runs that extracted no field at all,
+        are retried with exponential backoff.
+        
+        Raises:
+            ExtractionFailed: on a non-transient error, or once retries run out
+        """
+        for attempt in range(self.EXTRACTION_RETRIES + 1):
+            try:
+                checkpoint = self.incremental_extractor.extract_from_pdf(
+                    pdf_path=pdf_path,
+                    nct_number=nct_number,
+                    pdf_type=doc_type,
+                    compare_immediately=ctgov_csv_path is not None,
+                    ctgov_csv_path=ctgov_csv_path
+                )
+                reason = _nothing_extracted_reason(checkpoint)
+                if reason:
+                    raise _NothingExtracted(reason)
+                return checkpoint.to_extraction_dict()
+            except Exception as e:
+                print(f"Extraction failed for {doc_type} (attempt {attempt + 1}): {e}")
+                if attempt == self.EXTRACTION_RETRIES or not _is_transient(e):
+                    raise ExtractionFailed(f"{doc_type} extraction failed for {nct_number}: {e}") from e
+                time.sleep(2 ** attempt)
+    
+    def merge_extractions(self, nct_number: str, all_extractions: Dict[str, Any],
+                          failed_documents: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Merge extractions from multiple documents with priority rules and traceability.
+        
+        Fields that no successful document supplied, but that a failed document
+        could have, are marked NOT_EXTRACTED rather than NOT_FOUND.
+        """
+        failed_documents = list(failed_documents or [])
         unified = {
             "nct_number": nct_number,
             "extraction_date": datetime.now().isoformat(),
             "source_documents": list(all_extractions.keys()),
+            "failed_documents": failed_documents,
             "fields": {}
         }
         
-        # Priority order for different fields
-        field_priorities = {
-            # Protocol is best for these
-            "study_title": ["Protocol", "SAP", "ICF"],
-            "conditions": ["Protocol", "SAP", "ICF"],
-            "interventions": ["Protocol", "SAP", "ICF"],
-            "eligibility": ["Protocol", "ICF", "SAP"],
-            "sponsor": ["Protocol", "SAP", "ICF"],
-            
-            # SAP is best for these
-            "primary_outcome_measures": ["SAP", "Protocol", "ICF"],
-            "secondary_outcome_measures": ["SAP", "Protocol", "ICF"],
-            "statistical_methods": ["SAP", "Protocol", "ICF"],
-            "sample_size": ["SAP", "Protocol", "ICF"],
-            
-            # ICF might have unique patient-friendly info
-            "brief_summary": ["ICF", "Protocol", "SAP"],
-            
-            # Default priority
-            "_default": ["Protocol", "SAP", "ICF"]
-        }
-        
-        # Collect all unique fields across documents
-        all_fields = set()
+        # Index which documents supplied each field so resolving a field only
+        # touches the documents that actually have it
+        field_sources: Dict[str, Dict[str, Dict[str, Any]]] = {}
         for doc_type, extraction in all_extractions.items():
-            all_fields.update(extraction.get("fields", {}).keys())
+            for field_name, field_data in extraction.get("fields", {}).items():
+                field_sources.setdefault(field_name, {})[doc_type] = field_data
         
-        # For each field, find best value with traceability
-        for field_name in all_fields:
+        # For each field, find best value with traceability, counting the
+        # statistics as fields are placed
+        source_counts = Counter()
+        for field_name, sources in field_sources.items():
             # Get priority order for this field
-            priority = field_priorities.get(field_name, field_priorities["_default"])
+            priority = _FIELD_PRIORITIES.get(field_name, _FIELD_PRIORITIES["_default"])
             
             # Try each document type in priority order
             for doc_type in priority:
-                if doc_type in all_extractions:
-                    fields = all_extractions[doc_type].get("fields", {})
-                    if field_name in fields:
-                        field_data = fields[field_name]
-                        if field_data.get("status") == "completed" and field_data.get("value"):
-                            # Found a valid value
-                            unified["fields"][field_name] = {
-                                "value": field_data["value"],
-                                "source_document": doc_type,
-                                "source_pdf": all_extractions[doc_type]["pdf_path"],
-                                "extraction_time": field_data.get("extraction_time"),
-                                "confidence": field_data.get("confidence")
-                            }
-                            break
-            
-            # If no valid value found, record as not found
-            if field_name not in unified["fields"]:
+                field_data = sources.get(doc_type)
+                if field_data and field_data.get("status") == "completed" and field_data.get("value"):
+                    # Found a valid value
+                    unified["fields"][field_name] = {
+                        "value": field_data["value"],
+                        "source_document": doc_type,
+                        "source_pdf": all_extractions[doc_type]["pdf_path"],
+                        "extraction_time": field_data.get("extraction_time"),
+                        "confidence": field_data.get("confidence")
+                    }
+                    source_counts[doc_type] += 1
+                    break
+            else:
+                # No valid value found; if a document that failed could have
+                # supplied it, the field was never really looked for
+                missed = [d for d in priority if d in failed_documents]
                 unified["fields"][field_name] = {
                     "value": None,
-                    "source_document": "NOT_FOUND",
+                    "source_document": "NOT_EXTRACTED" if missed else "NOT_FOUND",
                     "attempted_documents": [d for d in priority if d in all_extractions]
                 }
+                if missed:
+                    unified["fields"][field_name]["failed_documents"] = missed
         
         # Add extraction statistics
-        total_fields = len(unified["fields"])
-        extracted_fields = sum(1 for f in unified["fields"].values() if f.get("value"))
+        total_fields = len(field_sources)
+        extracted_fields = sum(source_counts.values())
         
         unified["statistics"] = {
             "total_fields": total_fields,
             "extracted_fields": extracted_fields,
             "extraction_rate": f"{extracted_fields/total_fields*100:.1f}%" if total_fields > 0 else "0%",
-            "by_document": {}
+            "by_document": {doc_type: source_counts[doc_type] for doc_type in all_extractions}
         }
-        
-        # Stats by document
-        for doc_type in all_extractions:
-            doc_fields = sum(1 for f in unified["fields"].values() 
-                           if f.get("source_document") == doc_type)
-            unified["statistics"]["by_document"][doc_type] = doc_fields
             
         return unified
     
@@ -164,21 +359,37 @@ class EnhancedUnifiedExtractor:
         nct_dir.mkdir(parents=True, exist_ok=True)
         report_path = nct_dir / f"{nct_number}_unified_report.md"
         
-        # Load CT.gov data for comparison
+        # Load CT.gov data for comparison, keeping only the columns a field can
+        # look up (mapped names, plus unmapped fields that use their own name)
         ctgov_data = {}
-        csv_files = list(Path("examples").glob(f"{nct_number}_ct_*.csv"))
-        if csv_files:
-            with open(csv_files[0], 'r', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                ctgov_data = next(reader, {})
+        ctgov_csv = self._find_ctgov_csv(nct_number)
+        if ctgov_csv:
+            wanted = set(_FIELD_MAPPING.values()).union(unified_data['fields'])
+            with open(ctgov_csv, 'r', encoding='utf-8') as f:
+                reader = csv.reader(f)
+                header = next(reader, [])
+                # Like DictReader, skip blank lines before the first record
+                row = next(reader, None)
+                while row == []:
+                    row = next(reader, None)
+                if row is not None:
+                    ctgov_data = {
+                        header[i]: row[i]
+                        for i in range(min(len(header), len(row)))
+                        if header[i] in wanted
+                    }
         
-        with open(report_path, 'w') as f:
+        # Build the report in memory and write it out in one go
+        with io.StringIO() as f:
             f.write(f"# Unified Extraction Report: {nct_number}\n\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
             
             # Summary
             f.write("## Summary\n\n")
             f.write(f"- **Source Documents**: {', '.join(unified_data['source_documents'])}\n")
+            failed_documents = unified_data.get('failed_documents', [])
+            if failed_documents:
+                f.write(f"- **Failed Documents**: {', '.join(failed_documents)} (extraction failed)\n")
             f.write(f"- **Total Fields**: {unified_data['statistics']['total_fields']}\n")
             f.write(f"- **Successfully Extracted**: {unified_data['statistics']['extracted_fields']}\n")
             f.write(f"- **Extraction Rate**: {unified_data['statistics']['extraction_rate']}\n\n")
@@ -192,133 +403,157 @@ class EnhancedUnifiedExtractor:
             # Field results with comparison
             f.write("## Extraction Results\n\n")
             
-            field_mapping = {
-                'nct_number': 'NCT Number',
-                'study_title': 'Study Title',
-                'acronym': 'Acronym',
-                'brief_summary': 'Brief Summary',
-                'study_status': 'Study Status',
-                'conditions': 'Conditions',
-                'interventions': 'Interventions',
-                'primary_outcome_measures': 'Primary Outcome Measures',
-                'secondary_outcome_measures': 'Secondary Outcome Measures',
-                'sponsor': 'Sponsor',
-                'phases': 'Phases',
-                'enrollment': 'Enrollment',
-                'study_type': 'Study Type',
-                'study_design': 'Study Design',
-                'start_date': 'Start Date',
-                'sex': 'Sex',
-                'age': 'Age',
-                'funder_type': 'Funder Type',
-                'other_ids': 'Other IDs',
-                'locations': 'Locations',
+            # Sort every field into its report categories in a single pass
+            fields = unified_data['fields']
+            extracted = []  # (field_name, field_data, ctgov_value) in field order
+            not_found_fields = []
+            not_extracted_fields = []  # a document that could have supplied them failed
+            missing_in_both = []
+            missing_only_in_extraction = []
+            present_in_both = []
+            extracted_but_not_in_ctgov = []
+            contributed = {}  # source document -> fields it supplied
+            
+            for field_name, field_data in fields.items():
+                ctgov_value = ctgov_data.get(_FIELD_MAPPING.get(field_name, field_name), '')
+                extracted_value = field_data.get('value')
+                
+                if extracted_value:
+                    extracted.append((field_name, field_data, ctgov_value))
+                    contributed.setdefault(field_data.get('source_document'), []).append(field_name)
+                    if ctgov_value:
+                        present_in_both.append(field_name)
+                    else:
+                        extracted_but_not_in_ctgov.append((field_name, extracted_value))
+                else:
+                    if field_data.get('source_document') == 'NOT_EXTRACTED':
+                        not_extracted_fields.append(field_name)
+                    else:
+                        not_found_fields.append(field_name)
+                    if ctgov_value:
+                        missing_only_in_extraction.append((field_name, ctgov_value))
+                    else:
+                        missing_in_both.append(field_name)
+            
+            # Many fields share a source PDF, so name each one once
+            pdf_basenames = {
+                field_data['source_pdf']: os.path.basename(field_data['source_pdf'])
+                for _, field_data, _ in extracted
             }
             
+            # Fields whose values agree once case and surrounding whitespace are
+            # ignored match outright; only the rest need the comparator
+            exact_matches = {
+                field_name
+                for field_name, field_data, ctgov_value in extracted
+                if ctgov_value
+                and str(field_data['value']).strip().lower() == ctgov_value.strip().lower()
+            }
+            
+            # Compare the remaining fields both sources have up front, in batched LLM requests
+            comparisons = {}
+            if self.comparator:
+                comparable = [
+                    (field_name, field_data['value'], ctgov_value)
+                    for field_name, field_data, ctgov_value in extracted
+                    if ctgov_value and field_name not in exact_matches
+                ]
+                comparisons = dict(zip(
+                    [field_name for field_name, _, _ in comparable],
+                    self.comparator.compare_fields_batch(comparable)
+                ))
+                for field_name in exact_matches:
+                    comparisons[field_name] = (True, 1.0, "Exact match")
+            
             # Count comparison results
             matches = 0
             mismatches = 0
-            not_found = 0
+            not_found = len(not_found_fields)
             unique_extractions = 0
             
-            for field_name, field_data in unified_data['fields'].items():
-                if field_data.get('value'):
-                    f.write(f"### {field_name}\n\n")
-                    f.write(f"- **Extracted**: {field_data['value'][:200]}{'...' if len(str(field_data['value'])) > 200 else ''}\n")
-                    f.write(f"- **Source**: {field_data['source_document']} ({Path(field_data['source_pdf']).name})\n")
-                    
-                    # Compare with CT.gov if available
-                    ctgov_field = field_mapping.get(field_name, field_name)
-                    ctgov_value = ctgov_data.get(ctgov_field, '')
+            for field_name, field_data, ctgov_value in extracted:
+                f.write(f"### {field_name}\n\n")
+                f.write(f"- **Extracted**: {_truncate(field_data['value'])}\n")
+                f.write(f"- **Source**: {field_data['source_document']} ({pdf_basenames[field_data['source_pdf']]})\n")
+                
+                # Compare with CT.gov if available
+                if ctgov_value:
+                    f.write(f"- **CT.gov**: {_truncate(ctgov_value)}\n")
                     
-                    if ctgov_value:
-                        f.write(f"- **CT.gov**: {ctgov_value[:200]}{'...' if len(str(ctgov_value)) > 200 else ''}\n")
+                    # Use intelligent comparison if available
+                    if self.comparator:
+                        match, confidence, explanation = comparisons[field_name]
                         
-                        # Use intelligent comparison if available
-                        if self.comparator:
-                            match, confidence, explanation = self.comparator.compare_fields(
-                                field_name, field_data['value'], ctgov_value
-                            )
-                            
-                            if match:
-                                matches += 1
-                                f.write(f"- **Status**: MATCH ({confidence:.0%}) - {explanation}\n")
-                            else:
-                                mismatches += 1
-                                f.write(f"- **Status**: MISMATCH ({confidence:.0%}) - {explanation}\n")
+                        if match:
+                            matches += 1
+                            f.write(f"- **Status**: MATCH ({confidence:.0%}) - {explanation}\n")
                         else:
-                            # Simple comparison fallback
-                            if str(field_data['value']).lower().strip() == ctgov_value.lower().strip():
-                                matches += 1
-                                f.write(f"- **Status**: MATCH\n")
-                            else:
-                                mismatches += 1
-                                f.write(f"- **Status**: MISMATCH\n")
+                            mismatches += 1
+                            f.write(f"- **Status**: MISMATCH ({confidence:.0%}) - {explanation}\n")
                     else:
-                        unique_extractions += 1
-                        f.write(f"- **Status**: UNIQUE EXTRACTION (not in CT.gov)\n")
-                    
-                    f.write("\n")
+                        # Simple comparison fallback
+                        if field_name in exact_matches:
+                            matches += 1
+                            f.write(f"- **Status**: MATCH\n")
+                        else:
+                            mismatches += 1
+                            f.write(f"- **Status**: MISMATCH\n")
                 else:
-                    not_found += 1
+                    unique_extractions += 1
+                    f.write(f"- **Status**: UNIQUE EXTRACTION (not in CT.gov)\n")
+                
+                f.write("\n")
             
             # Not found fields section
             f.write("## Fields Not Found\n\n")
-            not_found_fields = [f for f, d in unified_data['fields'].items() if not d.get('value')]
             if not_found_fields:
                 for field in not_found_fields:
-                    attempted = unified_data['fields'][field].get('attempted_documents', [])
+                    attempted = fields[field].get('attempted_documents', [])
                     f.write(f"- **{field}**: Attempted in {', '.join(attempted)}\n")
-            else:
+            elif not not_extracted_fields:
                 f.write("All fields were successfully extracted!\n")
+            else:
+                f.write("No field was missing from the documents that were extracted.\n")
+            
+            if not_extracted_fields:
+                f.write("\n## Fields Not Extracted\n\n")
+                f.write("These fields were not found in the extracted documents, and a document that could have supplied them failed to extract:\n\n")
+                for field in not_extracted_fields:
+                    failed = fields[field].get('failed_documents', [])
+                    f.write(f"- **{field}**: {', '.join(failed)} extraction failed\n")
             
             # Comparison statistics
             f.write("\n## Comparison Statistics\n\n")
             total_compared = matches + mismatches
             if total_compared > 0:
-                f.write(f"- **Matches**: {matches} ({matches/total_compared*100:.1f}%)\n")
-                f.write(f"- **Mismatches**: {mismatches} ({mismatches/total_compared*100:.1f}%)\n")
+                compared_scale = 100.0 / total_compared
+                f.write(f"- **Matches**: {matches} ({matches*compared_scale:.1f}%)\n")
+                f.write(f"- **Mismatches**: {mismatches} ({mismatches*compared_scale:.1f}%)\n")
                 f.write(f"- **Unique Extractions**: {unique_extractions}\n")
                 f.write(f"- **Not Found**: {not_found}\n")
-                f.write(f"- **Overall Accuracy**: {matches/total_compared*100:.1f}%\n")
+                if not_extracted_fields:
+                    f.write(f"- **Not Extracted**: {len(not_extracted_fields)}\n")
+                f.write(f"- **Overall Accuracy**: {matches*compared_scale:.1f}%\n")
             
             # Completeness Analysis
             f.write("\n## Completeness Analysis\n\n")
             
-            # Check which fields are missing in both vs missing only in our extraction
-            missing_in_both = []
-            missing_only_in_extraction = []
-            present_in_both = []
-            extracted_but_not_in_ctgov = []
-            
-            for field_name in unified_data['fields'].keys():
-                ctgov_field = field_mapping.get(field_name, field_name)
-                ctgov_value = ctgov_data.get(ctgov_field, '')
-                extracted_value = unified_data['fields'][field_name].get('value')
-                
-                if not extracted_value and not ctgov_value:
-                    missing_in_both.append(field_name)
-                elif not extracted_value and ctgov_value:
-                    missing_only_in_extraction.append((field_name, ctgov_value))
-                elif extracted_value and ctgov_value:
-                    present_in_both.append(field_name)
-                elif extracted_value and not ctgov_value:
-                    extracted_but_not_in_ctgov.append((field_name, extracted_value))
-            
             # Report findings
             f.write(f"### Data Coverage Summary\n\n")
-            f.write(f"- **Total fields**: {len(unified_data['fields'])}\n")
-            f.write(f"- **Present in both**: {len(present_in_both)} ({len(present_in_both)/len(unified_data['fields'])*100:.1f}%)\n")
-            f.write(f"- **Missing in both**: {len(missing_in_both)} ({len(missing_in_both)/len(unified_data['fields'])*100:.1f}%)\n")
-            f.write(f"- **Missing only in extraction**: {len(missing_only_in_extraction)} ({len(missing_only_in_extraction)/len(unified_data['fields'])*100:.1f}%)\n")
-            f.write(f"- **Unique to extraction**: {len(extracted_but_not_in_ctgov)} ({len(extracted_but_not_in_ctgov)/len(unified_data['fields'])*100:.1f}%)\n")
+            total_fields = len(fields)
+            field_scale = 100.0 / total_fields if total_fields else 0.0
+            f.write(f"- **Total fields**: {total_fields}\n")
+            f.write(f"- **Present in both**: {len(present_in_both)} ({len(present_in_both)*field_scale:.1f}%)\n")
+            f.write(f"- **Missing in both**: {len(missing_in_both)} ({len(missing_in_both)*field_scale:.1f}%)\n")
+            f.write(f"- **Missing only in extraction**: {len(missing_only_in_extraction)} ({len(missing_only_in_extraction)*field_scale:.1f}%)\n")
+            f.write(f"- **Unique to extraction**: {len(extracted_but_not_in_ctgov)} ({len(extracted_but_not_in_ctgov)*field_scale:.1f}%)\n")
             
             # Detail sections
             if missing_only_in_extraction:
                 f.write(f"\n### Critical Misses (Present in CT.gov but not extracted)\n\n")
                 f.write("These fields should have been extracted:\n\n")
                 for field, ctgov_val in missing_only_in_extraction:
-                    f.write(f"- **{field}**: {ctgov_val[:100]}{'...' if len(str(ctgov_val)) > 100 else ''}\n")
+                    f.write(f"- **{field}**: {_truncate(ctgov_val, 100)}\n")
             
             if missing_in_both:
                 f.write(f"\n### Missing in Both Sources\n\n")
@@ -330,7 +565,7 @@ class EnhancedUnifiedExtractor:
                 f.write(f"\n### Unique Extractions (Added value)\n\n")
                 f.write("These fields were successfully extracted but not in CT.gov:\n\n")
                 for field, value in extracted_but_not_in_ctgov:
-                    f.write(f"- **{field}**: {value[:100]}{'...' if len(str(value)) > 100 else ''}\n")
+                    f.write(f"- **{field}**: {_truncate(value, 100)}\n")
             
             # Document contribution summary
             f.write("\n## Document Contributions\n\n")
@@ -338,25 +573,49 @@ class EnhancedUnifiedExtractor:
                 if count > 0:
                     f.write(f"### {doc_type}\n")
                     f.write(f"Contributed {count} fields:\n")
-                    doc_fields = [f for f, d in unified_data['fields'].items() 
-                                if d.get('source_document') == doc_type and d.get('value')]
+                    doc_fields = contributed.get(doc_type, [])
                     for field in doc_fields[:10]:  # Show first 10
                         f.write(f"- {field}\n")
                     if len(doc_fields) > 10:
                         f.write(f"- ... and {len(doc_fields) - 10} more\n")
                     f.write("\n")
+            
+            report_path.write_text(f.getvalue(), encoding="utf-8")
                 
         print(f"Generated enhanced unified report: {report_path}")
         
         # Also save JSON
         json_path = nct_dir / f"{nct_number}_unified_extraction.json"
-        with open(json_path, 'w') as f:
-            json.dump(unified_data, f, indent=2)
+        json_path.write_bytes(_dumps(unified_data))
 
-def main():
-    """Run enhanced unified extraction for all trials"""
+def process_trial(nct_number: str) -> Optional[Dict[str, Any]]:
+    """
+    Extract, merge and report one trial, returning its unified statistics.
+    
+    Runs in a worker process with its own extractor, so trials share no state.
+    """
     extractor = EnhancedUnifiedExtractor()
     
+    # Extract from all documents; types that failed are left out of the merge
+    all_extractions, failed_documents = extractor.extract_all_documents(nct_number)
+    
+    if not all_extractions:
+        return None
+    
+    # Merge with traceability
+    unified_data = extractor.merge_extractions(nct_number, all_extractions, failed_documents)
+    
+    # Generate enhanced report
+    extractor.generate_enhanced_report(nct_number, unified_data)
+    
+    return {
+        "statistics": unified_data['statistics'],
+        "source_documents": unified_data['source_documents'],
+        "failed_documents": unified_data['failed_documents']
+    }
+
+def main():
+    """Run enhanced unified extraction for all trials"""
     # Define trials
     trials = ["NCT02454972", "NCT03927651", "NCT05826873"]
     
@@ -364,25 +623,23 @@ def main():
     print("ENHANCED UNIFIED EXTRACTION PIPELINE")
     print("="*80)
     
-    for nct_number in trials:
-        print(f"\n{'='*60}")
-        print(f"Processing {nct_number}")
-        print('='*60)
-        
-        # Extract from all documents
-        all_extractions = extractor.extract_all_documents(nct_number)
-        
-        if all_extractions:
-            # Merge with traceability
-            unified_data = extractor.merge_extractions(nct_number, all_extractions)
-            
-            # Generate enhanced report
-            extractor.generate_enhanced_report(nct_number, unified_data)
+    # Trials write to disjoint output directories, so each gets a process, but
+    # only as many as keep the requests in flight under MAX_CONCURRENT_REQUESTS
+    requests_per_trial = EnhancedUnifiedExtractor.MAX_CONCURRENT_DOCUMENTS * ChunkMapper.MAX_CONCURRENT_REQUESTS
+    workers = max(1, min(len(trials), os.cpu_count() or 1, MAX_CONCURRENT_REQUESTS // requests_per_trial))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for nct_number, summary in zip(trials, executor.map(process_trial, trials)):
+            print(f"\n{'='*60}")
+            print(f"Processed {nct_number}")
+            print('='*60)
             
-            # Print summary
-            print(f"\nUnified extraction complete:")
-            print(f"  - Extracted {unified_data['statistics']['extracted_fields']}/{unified_data['statistics']['total_fields']} fields")
-            print(f"  - Used {len(unified_data['source_documents'])} documents")
+            if summary:
+                # Print summary
+                print(f"\nUnified extraction complete:")
+                print(f"  - Extracted {summary['statistics']['extracted_fields']}/{summary['statistics']['total_fields']} fields")
+                print(f"  - Used {len(summary['source_documents'])} documents")
+                if summary['failed_documents']:
+                    print(f"  - Failed to extract: {', '.join(summary['failed_documents'])}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file